@@ -0,0 +1,91 @@
+"""Compara bytes y latencia de /api/simulation con y sin compresión.
+
+Juega las mismas partidas de final.txt (semillas 0..n-1) con el cliente de
+prueba de Flask, en modo arreglo completo y en modo flujo, para cada codificación
+disponible. La latencia total suma el tiempo del servidor y el tiempo de
+transferencia estimado para el ancho de banda dado (--mbps).
+
+Uso:
+    python bench_compresion.py --games 20 --mbps 2
+"""
+import argparse
+import gzip
+import time
+
+import servidor_mapa
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+ENDPOINTS = {
+    "completo": "/api/simulation?seed={seed}",
+    "flujo": "/api/simulation/stream?seed={seed}",
+}
+
+
+def decompress(data, encoding):
+    if encoding == 'gzip':
+        return gzip.decompress(data)
+    if encoding == 'br':
+        return brotli.decompress(data)
+    return data
+
+
+def measure(client, url, encoding):
+    headers = {"Accept-Encoding": encoding}
+    start = time.perf_counter()
+    response = client.get(url, headers=headers)
+    data = response.get_data()
+    elapsed = time.perf_counter() - start
+    assert response.status_code == 200, response.status_code
+    assert response.headers.get('Content-Encoding', 'identity') == encoding, response.headers
+    return data, elapsed
+
+
+def run_benchmark(num_games, mbps):
+    encodings = ['identity', 'gzip'] + (['br'] if brotli is not None else [])
+    client = servidor_mapa.app.test_client()
+    results = []
+
+    for mode, template in ENDPOINTS.items():
+        totals = {encoding: [0, 0.0] for encoding in encodings}
+        for seed in range(num_games):
+            url = template.format(seed=seed)
+            # Calentar el caché de partidas para medir solo la respuesta
+            client.get(url)
+            plain = None
+            for encoding in encodings:
+                data, elapsed = measure(client, url, encoding)
+                body = decompress(data, encoding)
+                if plain is None:
+                    plain = body
+                assert body == plain, f"{mode} {encoding} semilla {seed}: contenido distinto"
+                totals[encoding][0] += len(data)
+                totals[encoding][1] += elapsed
+
+        for encoding, (size, elapsed) in totals.items():
+            transfer = size * 8 / (mbps * 1e6)
+            results.append({
+                "modo": mode,
+                "codificacion": encoding,
+                "bytes_por_partida": size / num_games,
+                "servidor_ms": 1000 * elapsed / num_games,
+                "total_ms": 1000 * (elapsed + transfer) / num_games,
+            })
+    return results
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Mide el efecto de comprimir las respuestas de simulación.")
+    parser.add_argument("--games", type=int, default=20)
+    parser.add_argument("--mbps", type=float, default=2.0, help="ancho de banda supuesto de la red")
+    args = parser.parse_args()
+
+    if brotli is None:
+        print("brotli no está instalado; solo se mide gzip")
+    print(f"{'modo':<10}{'codificación':<14}{'bytes':>10}{'servidor ms':>14}{'total ms':>12}")
+    for row in run_benchmark(args.games, args.mbps):
+        print(f"{row['modo']:<10}{row['codificacion']:<14}{row['bytes_por_partida']:>10.0f}"
+              f"{row['servidor_ms']:>14.2f}{row['total_ms']:>12.1f}")
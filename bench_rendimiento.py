@@ -0,0 +1,333 @@
+"""Suite de benchmarks del motor y del servidor, con comparación contra una línea base.
+
+Mide tres grupos:
+
+- micro: can_move, búsqueda de puertas, explosión, onda expansiva y flashover
+  sobre un tablero lleno de humo;
+- partidas: partidas completas con semilla en final.txt y en un edificio
+  generado de 50x50 (juegos/s y pasos/s);
+- servidor: /api/map y /api/simulation con el cliente de prueba de Flask,
+  con y sin caché (peticiones/s y bytes de la respuesta);
+- importacion: `import motor` y `import servidor_mapa` en un proceso nuevo
+  (tiempo y memoria residente). Si alguno carga matplotlib o seaborn el
+  programa termina con código 1.
+
+Cada caso se repite y se reporta el mejor tiempo por operación (el menos
+afectado por ruido), la mediana y el pico de memoria medido con tracemalloc
+en una corrida aparte. Los resultados se guardan en JSON; con --baseline se
+comparan contra una corrida anterior y el programa termina con código 1 si
+algún caso es más lento que la línea base por más de --threshold.
+
+Uso:
+    python bench_rendimiento.py --output bench.json
+    python bench_rendimiento.py --baseline bench.json --threshold 0.15
+    python bench_rendimiento.py --only micro --repeat 9
+"""
+import argparse
+import itertools
+import json
+import platform
+import statistics
+import subprocess
+import sys
+import time
+import tracemalloc
+
+import mesa
+import numpy as np
+
+from motor import BoardModel, Scenario, can_move, find_door, parse_file
+from generador_mapas import generate_map
+
+MAP_FILE = 'final.txt'
+GROUPS = ("micro", "partidas", "servidor", "importacion")
+# Módulos que el núcleo y el servidor no deben cargar (pandas sí llega, lo importa mesa)
+HEAVY_MODULES = ("matplotlib", "seaborn")
+
+
+def measure(func, setup=None, number=1, repeat=5, calls=1):
+    """Mide `func(state)`; `setup()` arma un estado nuevo fuera del tiempo medido.
+
+    `calls` es cuántas operaciones hace cada llamada, para reportar el tiempo
+    de una sola operación.
+    """
+    times = []
+    for _ in range(repeat):
+        total = 0.0
+        for _ in range(number):
+            state = setup() if setup is not None else None
+            start = time.perf_counter()
+            func(state)
+            total += time.perf_counter() - start
+        times.append(total / (number * calls))
+
+    state = setup() if setup is not None else None
+    tracemalloc.start()
+    func(state)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return {
+        "seconds": min(times),
+        "median_seconds": statistics.median(times),
+        "ops_per_s": 1 / min(times),
+        "peak_kib": peak / 1024,
+    }
+
+
+# --- Micro benchmarks ---
+
+def new_model(scenario, seed=0):
+    return BoardModel.from_scenario(scenario, collection_level="none", seed=seed)
+
+
+def smoky_board(scenario):
+    """Tablero con fuego en la primera columna y humo en todas las demás celdas."""
+    model = new_model(scenario)
+    for pos in list(model.hazards.fires):
+        model.hazards.remove_fire(pos)
+    for row in range(model.width):
+        for col in range(model.height):
+            if col == 0:
+                model.hazards.add_fire((row, col))
+            else:
+                model.hazards.add_smoke((row, col))
+    return model
+
+
+def bench_micro(scenario, repeat):
+    results = {}
+    pairs = [
+        ((row, col), (row + d_row, col + d_col))
+        for row in range(scenario.width) for col in range(scenario.height)
+        for d_row, d_col in ((-1, 0), (1, 0), (0, -1), (0, 1))
+    ]
+    wall_bits = [list(row) for row in scenario.wall_bits]
+
+    def check_moves(_):
+        for current, following in pairs:
+            can_move(current, following, wall_bits)
+    results["micro.can_move"] = measure(check_moves, number=200, repeat=repeat, calls=len(pairs))
+
+    door_index = new_model(scenario).door_index
+
+    def find_doors(_):
+        for current, following in pairs:
+            find_door(current, following, door_index)
+    results["micro.find_door"] = measure(find_doors, number=200, repeat=repeat, calls=len(pairs))
+
+    # Explosión en cada celda con fuego de un tablero recién creado
+    def explode(model):
+        for pos in list(model.hazards.fires):
+            model.handle_explosion(pos)
+    fires = len(new_model(scenario).hazards.fires)
+    results["micro.explosion"] = measure(explode, lambda: new_model(scenario), number=20, repeat=repeat, calls=fires)
+
+    # Onda expansiva a lo largo de cada fila encendida
+    def shockwaves(model):
+        for row in range(model.width):
+            model.propagate_shockwave((row, 0), 0, 1, 'E', 'W')
+    def burning_rows():
+        model = smoky_board(scenario)
+        for pos in list(model.hazards.smokes):
+            model.hazards.remove_smoke(pos)
+            model.hazards.add_fire(pos)
+        return model
+    results["micro.shockwave"] = measure(shockwaves, burning_rows, number=20, repeat=repeat, calls=scenario.width)
+
+    def flashover(model):
+        model.process_fire_adjacent_smoke()
+    results["micro.flashover"] = measure(flashover, lambda: smoky_board(scenario), number=20, repeat=repeat)
+    return results
+
+
+# --- Partidas completas ---
+
+def play(scenario, seeds, max_steps):
+    steps = 0
+    for seed in seeds:
+        model = new_model(scenario, seed)
+        while model.steps < max_steps and not model.check_termination_conditions():
+            model.step_round(max_steps=max_steps)
+        steps += model.steps
+    return steps
+
+
+def bench_games(name, scenario, num_games, max_steps, repeat):
+    seeds = list(range(num_games))
+    steps = play(scenario, seeds, max_steps)
+    # Una operación es una partida
+    result = measure(lambda _: play(scenario, seeds, max_steps), repeat=repeat, calls=num_games)
+    result["games_per_s"] = result["ops_per_s"]
+    result["steps_per_s"] = steps / (result["seconds"] * num_games)
+    return {f"partidas.{name}": result}
+
+
+def generated_scenario(size, seed=0):
+    *parsed, firefighters = generate_map(size, size, seed)
+    return Scenario.from_parsed(*parsed, firefighters=firefighters)
+
+
+# --- Servidor ---
+
+def bench_server(repeat, num_games):
+    import servidor_mapa
+
+    client = servidor_mapa.app.test_client()
+    results = {}
+
+    def get(url, expected=200):
+        response = client.get(url)
+        assert response.status_code == expected, (url, response.status_code)
+        return len(response.get_data())
+
+    size = get('/api/map')
+    result = measure(lambda _: get('/api/map'), number=50, repeat=repeat)
+    results["servidor.map"] = dict(result, bytes=size)
+
+    # Sin caché: cada petición usa una semilla que no se ha jugado
+    seeds = itertools.count(10**6)
+
+    def uncached(_):
+        for _ in range(num_games):
+            get(f'/api/simulation?seed={next(seeds)}')
+    servidor_mapa.simulation_cache.clear()
+    size = get('/api/simulation?seed=0')
+    result = measure(uncached, repeat=repeat, calls=num_games)
+    results["servidor.simulation"] = dict(result, bytes=size)
+
+    result = measure(lambda _: get('/api/simulation?seed=0'), number=20, repeat=repeat)
+    results["servidor.simulation_cached"] = dict(result, bytes=size)
+
+    compact = get('/api/simulation?seed=0&encoding=compact')
+    result = measure(lambda _: get('/api/simulation?seed=0&encoding=compact'), number=20, repeat=repeat)
+    results["servidor.simulation_compact"] = dict(result, bytes=compact)
+    return results
+
+
+# --- Importación ---
+
+IMPORT_SCRIPT = """
+import resource, sys, time
+start = time.perf_counter()
+import {module}
+seconds = time.perf_counter() - start
+heavy = [name for name in {heavy!r} if name in sys.modules]
+print(seconds, resource.getrusage(resource.RUSAGE_SELF).ru_maxrss, ','.join(heavy))
+"""
+
+
+def time_import(module):
+    """Importa `module` en un proceso nuevo; regresa (segundos, KiB residentes, módulos pesados cargados)."""
+    script = IMPORT_SCRIPT.format(module=module, heavy=HEAVY_MODULES)
+    output = subprocess.run([sys.executable, '-c', script], capture_output=True, text=True, check=True).stdout
+    seconds, rss, heavy = output.split('\n')[-2].split(' ')
+    return float(seconds), int(rss), [name for name in heavy.split(',') if name]
+
+
+def bench_imports(repeat):
+    results = {}
+    for module in ("motor", "servidor_mapa"):
+        runs = [time_import(module) for _ in range(repeat)]
+        times = [seconds for seconds, _, _ in runs]
+        results[f"importacion.{module}"] = {
+            "seconds": min(times),
+            "median_seconds": statistics.median(times),
+            "ops_per_s": 1 / min(times),
+            "peak_kib": max(rss for _, rss, _ in runs),
+            "heavy_modules": sorted({name for _, _, heavy in runs for name in heavy}),
+        }
+    return results
+
+
+def run_suite(groups=GROUPS, repeat=5, games=20, large_size=50, large_games=2, max_steps=600):
+    scenario = parse_file(MAP_FILE, as_scenario=True)
+    results = {}
+    if "micro" in groups:
+        results.update(bench_micro(scenario, repeat))
+    if "partidas" in groups:
+        results.update(bench_games("final", scenario, games, max_steps, repeat))
+        # Partidas completas en el edificio grande, con el mismo límite de pasos que final.txt
+        results.update(bench_games(f"generado_{large_size}", generated_scenario(large_size), large_games,
+                                   max_steps, repeat))
+    if "servidor" in groups:
+        results.update(bench_server(repeat, max(1, games // 4)))
+    if "importacion" in groups:
+        results.update(bench_imports(repeat))
+    return {
+        "meta": {
+            "time": time.strftime('%Y-%m-%dT%H:%M:%S'),
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "mesa": mesa.__version__,
+            "machine": platform.machine(),
+            "repeat": repeat,
+        },
+        "results": results,
+    }
+
+
+def compare(current, baseline, threshold):
+    """Filas (caso, base, actual, cambio, regresión) de los casos que están en las dos corridas."""
+    rows = []
+    for name, result in current["results"].items():
+        base = baseline["results"].get(name)
+        if base is None:
+            continue
+        change = result["seconds"] / base["seconds"] - 1
+        rows.append((name, base["seconds"], result["seconds"], change, change > threshold))
+    return rows
+
+
+def print_results(results):
+    print(f"{'caso':<32}{'mejor':>12}{'mediana':>12}{'op/s':>12}{'pico KiB':>10}  extra")
+    for name, result in results.items():
+        extra = []
+        if "games_per_s" in result:
+            extra.append(f"{result['games_per_s']:.1f} partidas/s, {result['steps_per_s']:.0f} pasos/s")
+        if "bytes" in result:
+            extra.append(f"{result['bytes']} bytes")
+        if result.get("heavy_modules"):
+            extra.append(f"carga {', '.join(result['heavy_modules'])}")
+        print(f"{name:<32}{format_seconds(result['seconds']):>12}{format_seconds(result['median_seconds']):>12}"
+              f"{result['ops_per_s']:>12.1f}{result['peak_kib']:>10.0f}  {', '.join(extra)}")
+
+
+def format_seconds(seconds):
+    for unit, scale in (("s", 1), ("ms", 1e-3), ("us", 1e-6)):
+        if seconds >= scale:
+            return f"{seconds / scale:.2f} {unit}"
+    return f"{seconds / 1e-9:.0f} ns"
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Mide el rendimiento del motor y del servidor.")
+    parser.add_argument("--only", choices=GROUPS, action='append', help="grupos a correr (todos por defecto)")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--games", type=int, default=20, help="partidas de final.txt por repetición")
+    parser.add_argument("--large-size", type=int, default=50, help="lado del edificio generado")
+    parser.add_argument("--large-games", type=int, default=2, help="partidas del edificio generado por repetición")
+    parser.add_argument("--output", default=None, help="JSON donde guardar los resultados")
+    parser.add_argument("--baseline", default=None, help="JSON de una corrida anterior para comparar")
+    parser.add_argument("--threshold", type=float, default=0.10, help="cambio relativo que cuenta como regresión")
+    args = parser.parse_args()
+
+    report = run_suite(args.only or GROUPS, args.repeat, args.games, args.large_size, args.large_games)
+    print_results(report["results"])
+    if args.output:
+        with open(args.output, 'w') as file:
+            json.dump(report, file, indent=2)
+
+    heavy = [name for name, result in report["results"].items() if result.get("heavy_modules")]
+    if heavy:
+        print(f"\nImportan módulos de dibujo: {', '.join(heavy)}")
+        raise SystemExit(1)
+
+    if args.baseline:
+        with open(args.baseline) as file:
+            baseline = json.load(file)
+        rows = compare(report, baseline, args.threshold)
+        print(f"\n{'caso':<32}{'base':>12}{'actual':>12}{'cambio':>10}")
+        for name, base, current, change, regressed in rows:
+            mark = "  REGRESIÓN" if regressed else ""
+            print(f"{name:<32}{format_seconds(base):>12}{format_seconds(current):>12}{change:>+10.1%}{mark}")
+        raise SystemExit(1 if any(row[4] for row in rows) else 0)
@@ -0,0 +1,284 @@
+"""Dibujos del tablero para el notebook (matplotlib y seaborn).
+
+Se carga hasta que se usa algún `draw_*` de AgentesModelo; el servidor y las
+simulaciones en lote nunca lo importan.
+"""
+# %%
+import matplotlib
+import matplotlib.pyplot as plt
+import matplotlib.animation as animation
+from matplotlib.colors import ListedColormap
+from matplotlib.collections import LineCollection
+import seaborn as sns
+plt.rcParams["animation.html"] = "jshtml"
+matplotlib.rcParams['animation.embed_limit'] = 2**128
+import numpy as np
+import pandas as pd
+
+# %%
+def draw_smoke(ax, smokes, num_rows):
+    for smoke in smokes:
+        row, col = smoke['row'], smoke['col']
+        x, y = col, num_rows - row - 1  # Ajuste para coordenadas
+
+        color = 'gray'
+        marker_shape = 's'  # Cuadrado para representar el humo
+
+        ax.scatter(x, y, marker=marker_shape, color=color, s=100)
+
+
+# %%
+def draw_exit_distances(ax, distances, num_rows):
+    # Costo en AP hasta la salida más cercana, escrito en cada celda
+    for row, costs in enumerate(distances):
+        for col, cost in enumerate(costs):
+            if cost is None:
+                continue
+            x, y = col, num_rows - row - 1  # Ajuste para coordenadas
+            ax.text(x + 0.35, y - 0.35, str(cost), color='dimgray', fontsize=7, ha='center', va='center')
+
+
+# %%
+def draw_fire(ax, fires, num_rows):
+    for fire in fires:
+        row, col = fire['row'], fire['col']
+        x, y = col, num_rows - row - 1  # Ajuste para coordenadas
+
+        color = 'red'
+        marker_shape = '*'  # Forma de estrella para representar el fuego
+
+        ax.scatter(x, y, marker=marker_shape, color=color, s=200)
+
+
+# %%
+def draw_poi(ax, markers, num_rows):
+    for marker in markers:
+        row, col, type_, revealed = marker
+        x, y = col, num_rows - row - 1 # Ajuste para coordenadas
+
+        if revealed:
+            continue
+        else:
+            if not revealed:
+                color = 'cyan'
+                marker_shape = 'o'
+            elif type_ == 'v':
+                color = 'green'
+                marker_shape = 'o'
+            elif type_ == 'f':
+                color = 'magenta'
+                marker_shape = 'x'
+        
+
+        ax.scatter(x, y, marker=marker_shape, color=color, s=100)
+
+# %%
+def draw_walls(ax, walls_grid, door_dict, entrances):
+    # Dentro de la función draw_walls o después de crear el subplot
+    for spine in ax.spines.values():
+        spine.set_visible(False)
+
+    num_rows = len(walls_grid)
+    num_cols = len(walls_grid[0])
+
+    # Crear un conjunto de entradas para acceso rápido
+    entrances_set = set((entry['col'], entry['row']) for entry in entrances)
+
+    for row in range(num_rows):
+        for col in range(num_cols):
+            walls = walls_grid[row][col]
+            x, y = col - 0.5, num_rows - row - 0.5  # Ajuste para coordenadas
+
+            cell = (col, row)  # Coordenadas en orden (x, y)
+
+            # Definir direcciones y ajustes
+            directions = [
+                ((0, -1), [x, x + 1], [y, y]),         # Pared superior
+                ((1, 0),  [x + 1, x + 1], [y - 1, y]), # Pared derecha
+                ((0, 1),  [x, x + 1], [y - 1, y - 1]), # Pared inferior
+                ((-1, 0), [x, x], [y - 1, y])          # Pared izquierda
+            ]
+
+            for idx, ((dx, dy), x_coords, y_coords) in enumerate(directions):
+                neighbor_col = col + dx
+                neighbor_row = row + dy
+                neighbor = (neighbor_col, neighbor_row)
+                
+                # Verificar si la pared existe
+                if walls[idx] == "1":
+                    # Verificar si es una pared en el borde
+                    is_edge_wall = False
+                    if neighbor_col < 0 or neighbor_col >= num_cols or neighbor_row < 0 or neighbor_row >= num_rows:
+                        is_edge_wall = True
+
+                    # Determinar el color de la pared
+                    if is_edge_wall and cell in entrances_set:
+                        # Pared perimetral con una entrada: dibujar en naranja
+                        color = "orange"
+                        linestyle = "-"
+                    else:
+                        # Pared normal o perimetral sin entrada
+                        door = door_dict.get((cell, neighbor))
+                        if door:
+                            if door['is_open']:
+                                color = "green"
+                                linestyle = "--"
+                            else:
+                                color = "brown"
+                                linestyle = "-"
+                        else:
+                            color = "black"
+                            linestyle = "-"
+                    
+                    # Dibujar la pared con el color y estilo determinados
+                    ax.plot(x_coords, y_coords, color=color, linestyle=linestyle, linewidth=2)
+                else:
+                    # No hay pared; no dibujamos nada
+                    pass
+
+# %%
+class BoardRenderer:
+    """Dibuja los cuadros de la animación sin borrar el eje en cada paso.
+
+    Los artistas se crean una sola vez: la imagen de los agentes, dos
+    LineCollection para las paredes (sólidas y puertas abiertas punteadas) y un
+    scatter por tipo de marcador. `draw(state)` solo les cambia los datos a los
+    que cambiaron y regresa todos, como pide FuncAnimation con blit=True. La
+    imagen es la misma que dan draw_walls, draw_poi, draw_fire y draw_smoke.
+    """
+
+    # (dx, dy) del vecino y extremos del segmento, en el orden de los bits "NESW"
+    SIDES = (
+        ((0, -1), ((0, 0), (1, 0))),    # Pared superior
+        ((1, 0), ((1, -1), (1, 0))),    # Pared derecha
+        ((0, 1), ((0, -1), (1, -1))),   # Pared inferior
+        ((-1, 0), ((0, -1), (0, 0))),   # Pared izquierda
+    )
+
+    def __init__(self, ax, num_rows, num_cols, entrances, cmap, show_exit_distances=False):
+        self.ax = ax
+        self.num_rows = num_rows
+        self.num_cols = num_cols
+        entrances_set = set((entry['col'], entry['row']) for entry in entrances)
+
+        # Un lugar por lado de cada celda, en el mismo orden en que draw_walls los recorre
+        self.slots = []
+        for row in range(num_rows):
+            for col in range(num_cols):
+                x, y = col - 0.5, num_rows - row - 0.5  # Ajuste para coordenadas
+                for (dx, dy), ends in self.SIDES:
+                    neighbor = (col + dx, row + dy)
+                    is_edge_wall = not (0 <= neighbor[0] < num_cols and 0 <= neighbor[1] < num_rows)
+                    self.slots.append({
+                        'segment': [(x + ex, y + ey) for ex, ey in ends],
+                        'entrance': is_edge_wall and (col, row) in entrances_set,
+                        'pair': ((col, row), neighbor),
+                    })
+        # Índice de la puerta de cada lado; se arma con las puertas del primer cuadro
+        self.door_slots = None
+        self.last_walls = None
+        self.last_doors = None
+        self.last_pois = None
+        self.last_fires = None
+        self.last_smokes = None
+        self.last_exit = None
+
+        ax.clear()
+        ax.set_xticks([])
+        ax.set_yticks([])
+        for spine in ax.spines.values():
+            spine.set_visible(False)
+
+        extent = [-0.5, num_cols - 0.5, -0.5, num_rows - 0.5]
+        # vmin/vmax fijos: 0 es blanco y 2 (agente) azul, igual que al normalizar cada cuadro
+        self.image = ax.imshow(np.zeros((num_rows, num_cols)), cmap=cmap, vmin=0, vmax=2, interpolation="none",
+                               origin='upper', extent=extent)
+        self.pois = ax.scatter([], [], marker='o', color='cyan', s=100)
+        self.fires = ax.scatter([], [], marker='*', color='red', s=200)
+        self.smokes = ax.scatter([], [], marker='s', color='gray', s=100)
+        # Mismos remates que ax.plot: sólidas "projecting", punteadas "butt"
+        self.walls = LineCollection([], linewidths=2, capstyle='projecting', zorder=2)
+        self.open_doors = LineCollection([], colors='green', linestyles='--', linewidths=2, capstyle='butt',
+                                         zorder=2)
+        ax.add_collection(self.walls, autolim=False)
+        ax.add_collection(self.open_doors, autolim=False)
+
+        self.texts = []
+        if show_exit_distances:
+            self.texts = [
+                ax.text(col + 0.35, num_rows - row - 1 - 0.35, '', color='dimgray', fontsize=7, ha='center',
+                        va='center')
+                for row in range(num_rows) for col in range(num_cols)
+            ]
+        ax.set_xlim(extent[0], extent[1])
+        ax.set_ylim(extent[2], extent[3])
+
+    def artists(self):
+        """Todos los artistas que cambian, en el orden en que se dibujan."""
+        return [self.image, self.pois, self.fires, self.smokes, self.walls, self.open_doors, *self.texts]
+
+    def offsets(self, cells):
+        # Centro de cada celda en coordenadas del eje
+        if not cells:
+            return np.empty((0, 2))
+        return np.array([(col, self.num_rows - row - 1) for row, col in cells], dtype=float)
+
+    def update_walls(self, walls_grid, doors):
+        if self.door_slots is None:
+            door_dict = {}
+            for index, door in enumerate(doors):
+                cell1 = (door['col1'], door['row1'])
+                cell2 = (door['col2'], door['row2'])
+                door_dict[(cell1, cell2)] = index
+                door_dict[(cell2, cell1)] = index
+            self.door_slots = [door_dict.get(slot['pair']) for slot in self.slots]
+
+        segments, colors, open_segments = [], [], []
+        bits = ''.join(''.join(row) for row in walls_grid)
+        for bit, slot, door in zip(bits, self.slots, self.door_slots):
+            if bit != '1':
+                continue
+            if slot['entrance']:
+                color = 'orange'
+            elif door is None:
+                color = 'black'
+            elif doors[door]['is_open']:
+                open_segments.append(slot['segment'])
+                continue
+            else:
+                color = 'brown'
+            segments.append(slot['segment'])
+            colors.append(color)
+        self.walls.set_segments(segments)
+        self.walls.set_color(colors)
+        self.open_doors.set_segments(open_segments)
+
+    def draw(self, state):
+        """Pone el estado de un paso en los artistas y los regresa."""
+        self.image.set_data(state["Grid"])
+
+        walls = state["Walls"]
+        doors = tuple(door['is_open'] for door in state["Doors"])
+        if walls != self.last_walls or doors != self.last_doors:
+            self.update_walls(walls, state["Doors"])
+            self.last_walls, self.last_doors = walls, doors
+
+        if state["POI"] != self.last_pois:
+            self.last_pois = state["POI"]
+            self.pois.set_offsets(self.offsets([(row, col) for row, col, _, revealed in self.last_pois
+                                                if not revealed]))
+
+        for key, collection, last in (("Fires", self.fires, "last_fires"), ("Smokes", self.smokes, "last_smokes")):
+            cells = [(cell['row'], cell['col']) for cell in state[key]]
+            if cells != getattr(self, last):
+                setattr(self, last, cells)
+                collection.set_offsets(self.offsets(cells))
+
+        if self.texts and state["ExitDistances"] is None:
+            raise ValueError("La partida no guardó ExitDistances; crea el modelo con overlays=('exit',)")
+        if self.texts and state["ExitDistances"] != self.last_exit:
+            self.last_exit = state["ExitDistances"]
+            costs = [cost for row in self.last_exit for cost in row]
+            for text, cost in zip(self.texts, costs):
+                text.set_text('' if cost is None else str(cost))
+        return self.artists()
@@ -0,0 +1,215 @@
+"""Formato binario compacto para los cuadros de /api/simulation.
+
+Se pide con `?encoding=compact` o con `Accept: application/vnd.flashpoint.frames`.
+En lugar de repetir llaves JSON en cada cuadro, manda una vez la forma del
+tablero, sus paredes, puertas y entradas y los ids de los agentes, y después
+cada cuadro como arreglos de bytes de tamaño fijo. Todos los enteros son
+little-endian.
+
+Encabezado (20 bytes + ids de agentes + tablero):
+
+    offset  tipo      campo
+    0       4 bytes   magic = b"FPF1"
+    4       uint8     versión = 2
+    5       uint8     flags; bit 0 = cuerpo comprimido con zlib,
+                      bit 1 = cada cuadro trae la capa de distancias a la salida
+    6       uint16    rows (filas de la rejilla)
+    8       uint16    cols (columnas de la rejilla)
+    10      uint16    n_agents
+    12      uint32    n_frames
+    16      uint16    n_doors
+    18      uint16    n_entrances
+    20      uint16[n_agents]  ids de los agentes, en el orden de los cuadros
+
+Tablero (nunca comprimido), justo después de los ids:
+
+    CELLS bytes          uint8 por celda: paredes con N=8, E=4, S=2, W=1
+    9 * n_doors          por puerta: uint16 row1, col1, row2, col2 y uint8 is_open
+    4 * n_entrances      por entrada: uint16 row, col
+
+Es el tablero al empezar la partida, el mismo que da /api/map; los cuadros no
+traen paredes ni puertas.
+
+Cuerpo (comprimido con zlib como un solo bloque si el flag está activo):
+n_frames cuadros seguidos, todos de FRAME_SIZE bytes, con
+CELLS = rows * cols y BITSET = ceil(CELLS / 8):
+
+    CELLS bytes      uint8 por celda: valor de "grid" (0 vacío, 2 agente)
+    BITSET bytes     celdas con fuego
+    BITSET bytes     celdas con humo
+    4 * n_agents     por agente: int16 row, int16 col (-1, -1 si aún no entra)
+    2 bytes          uint16 rescued_victims
+    2 bytes          uint16 total_damage
+    2 * CELLS        solo con el bit 1 de flags (?overlay=exit): uint16 por celda
+                     con el costo en AP hasta la salida, 0xFFFF si no hay camino
+
+Las celdas se numeran por filas: i = row * cols + col. En los bitsets, la celda
+i es el bit (i % 8) del byte i // 8, empezando por el bit menos significativo.
+
+Para decodificarlo (por ejemplo en C#): leer el encabezado y el tablero, inflar
+el cuerpo si el flag lo indica y recorrer los cuadros de FRAME_SIZE en
+FRAME_SIZE bytes; `decode_board` y `decode_frames` son la implementación de
+referencia. Los fuegos y humos salen en orden de filas, no en el orden del JSON.
+"""
+import struct
+import zlib
+
+import numpy as np
+
+CONTENT_TYPE = 'application/vnd.flashpoint.frames'
+MAGIC = b'FPF1'
+VERSION = 2
+FLAG_ZLIB = 0b0001
+FLAG_EXIT = 0b0010
+# Costo de una celda sin camino a la salida en la capa de distancias
+NO_EXIT = 0xFFFF
+
+HEADER = struct.Struct('<4sBBHHHIHH')
+DOOR = struct.Struct('<HHHHB')
+ENTRANCE = struct.Struct('<HH')
+
+
+def frame_size(rows, cols, n_agents, exit_overlay=False):
+    cells = rows * cols
+    bitset = (cells + 7) // 8
+    return cells + 2 * bitset + 4 * n_agents + 4 + (2 * cells if exit_overlay else 0)
+
+
+def encode_board(wall_bits, doors, entrances):
+    """Sección del tablero: paredes por celda, puertas y entradas."""
+    data = bytearray(bytes(cell & 0b1111 for row in wall_bits for cell in row))
+    for door in doors:
+        data += DOOR.pack(door['row1'], door['col1'], door['row2'], door['col2'], bool(door['is_open']))
+    for entrance in entrances:
+        data += ENTRANCE.pack(entrance['row'], entrance['col'])
+    return bytes(data)
+
+
+def encode_frames(frames, wall_bits, doors, entrances, compress=False, level=6):
+    """Codifica una lista de cuadros (el formato JSON de /api/simulation) y el tablero a bytes.
+
+    `wall_bits` es la rejilla de paredes en enteros (como Scenario.wall_bits);
+    `doors` y `entrances` son los registros del mapa. Si los cuadros traen
+    "exit_distance" (?overlay=exit) también se codifica esa capa.
+    """
+    rows, cols = len(wall_bits), len(wall_bits[0])
+    cells = rows * cols
+    exit_overlay = bool(frames) and "exit_distance" in frames[0]
+
+    # Ids en orden de aparición; los agentes entran al tablero en los primeros pasos
+    agent_ids = []
+    for frame in frames:
+        for agent in frame["agents"]:
+            if agent["id"] not in agent_ids:
+                agent_ids.append(agent["id"])
+    agent_slot = {agent_id: slot for slot, agent_id in enumerate(agent_ids)}
+
+    body = bytearray()
+    for frame in frames:
+        grid = np.asarray(frame["grid"], dtype=np.uint8).reshape(cells)
+
+        hazards = np.zeros((2, cells), dtype=bool)
+        for layer, key in enumerate(("fires", "smokes")):
+            for cell in frame[key]:
+                if not (0 <= cell["row"] < rows and 0 <= cell["col"] < cols):
+                    raise ValueError(f"Celda fuera del tablero: {cell}")
+                hazards[layer, cell["row"] * cols + cell["col"]] = True
+
+        positions = np.full((len(agent_ids), 2), -1, dtype='<i2')
+        for agent in frame["agents"]:
+            positions[agent_slot[agent["id"]]] = agent["pos"]
+
+        body += grid.tobytes()
+        body += np.packbits(hazards[0], bitorder='little').tobytes()
+        body += np.packbits(hazards[1], bitorder='little').tobytes()
+        body += positions.tobytes()
+        body += struct.pack('<HH', frame["rescued_victims"], frame["total_damage"])
+        if exit_overlay:
+            costs = [NO_EXIT if cost is None else cost for row in frame["exit_distance"] for cost in row]
+            body += np.asarray(costs, dtype='<u2').tobytes()
+
+    flags = FLAG_EXIT if exit_overlay else 0
+    if compress:
+        body = zlib.compress(bytes(body), level)
+        flags |= FLAG_ZLIB
+
+    header = HEADER.pack(MAGIC, VERSION, flags, rows, cols, len(agent_ids), len(frames), len(doors), len(entrances))
+    return (header + struct.pack(f'<{len(agent_ids)}H', *agent_ids) + encode_board(wall_bits, doors, entrances)
+            + bytes(body))
+
+
+def read_header(data):
+    """Regresa (campos del encabezado, ids de agentes, offset del tablero)."""
+    magic, version, flags, rows, cols, n_agents, n_frames, n_doors, n_entrances = HEADER.unpack_from(data, 0)
+    if magic != MAGIC or version != VERSION:
+        raise ValueError(f"No es un archivo de cuadros FPF1 versión {VERSION}")
+    header = {"flags": flags, "rows": rows, "cols": cols, "n_agents": n_agents, "n_frames": n_frames,
+              "n_doors": n_doors, "n_entrances": n_entrances}
+    agent_ids = struct.unpack_from(f'<{n_agents}H', data, HEADER.size)
+    return header, agent_ids, HEADER.size + 2 * n_agents
+
+
+def board_size(header):
+    return header["rows"] * header["cols"] + DOOR.size * header["n_doors"] + ENTRANCE.size * header["n_entrances"]
+
+
+def decode_board(data):
+    """Tablero del encabezado: {"walls": filas de enteros, "doors": [...], "entrances": [...]}."""
+    header, _, offset = read_header(data)
+    rows, cols = header["rows"], header["cols"]
+    walls = np.frombuffer(data, dtype=np.uint8, count=rows * cols, offset=offset).reshape(rows, cols)
+    offset += rows * cols
+
+    doors = []
+    for _ in range(header["n_doors"]):
+        row1, col1, row2, col2, is_open = DOOR.unpack_from(data, offset)
+        doors.append({"row1": row1, "col1": col1, "row2": row2, "col2": col2, "is_open": bool(is_open)})
+        offset += DOOR.size
+    entrances = []
+    for _ in range(header["n_entrances"]):
+        row, col = ENTRANCE.unpack_from(data, offset)
+        entrances.append({"row": row, "col": col})
+        offset += ENTRANCE.size
+    return {"walls": walls.tolist(), "doors": doors, "entrances": entrances}
+
+
+def decode_frames(data):
+    """Decodificador de referencia: regresa los cuadros con las mismas llaves que el JSON."""
+    header, agent_ids, offset = read_header(data)
+    flags, rows, cols, n_agents = header["flags"], header["rows"], header["cols"], header["n_agents"]
+    body = data[offset + board_size(header):]
+    if flags & FLAG_ZLIB:
+        body = zlib.decompress(body)
+
+    cells = rows * cols
+    bitset = (cells + 7) // 8
+    exit_overlay = bool(flags & FLAG_EXIT)
+    size = frame_size(rows, cols, n_agents, exit_overlay)
+    counters = cells + 2 * bitset + 4 * n_agents
+
+    frames = []
+    for start in range(0, header["n_frames"] * size, size):
+        frame = memoryview(body)[start:start + size]
+        grid = np.frombuffer(frame[:cells], dtype=np.uint8).reshape(rows, cols)
+        fires = np.unpackbits(np.frombuffer(frame[cells:cells + bitset], dtype=np.uint8), count=cells, bitorder='little')
+        smokes = np.unpackbits(np.frombuffer(frame[cells + bitset:cells + 2 * bitset], dtype=np.uint8), count=cells, bitorder='little')
+        positions = np.frombuffer(frame[cells + 2 * bitset:counters], dtype='<i2').reshape(n_agents, 2)
+        rescued_victims, total_damage = struct.unpack_from('<HH', frame, counters)
+
+        decoded = {
+            "grid": grid.astype(float).tolist(),
+            "fires": [{"row": int(i) // cols, "col": int(i) % cols} for i in np.flatnonzero(fires)],
+            "smokes": [{"row": int(i) // cols, "col": int(i) % cols} for i in np.flatnonzero(smokes)],
+            "agents": [
+                {"id": agent_id, "pos": [int(row), int(col)]}
+                for agent_id, (row, col) in zip(agent_ids, positions)
+                if row >= 0
+            ],
+            "rescued_victims": rescued_victims,
+            "total_damage": total_damage,
+        }
+        if exit_overlay:
+            costs = np.frombuffer(frame[counters + 4:], dtype='<u2').reshape(rows, cols)
+            decoded["exit_distance"] = [[None if cost == NO_EXIT else int(cost) for cost in row] for row in costs]
+        frames.append(decoded)
+    return frames
@@ -0,0 +1,185 @@
+"""Generador de edificios aleatorios con el formato de mapa con encabezado.
+
+El edificio se parte en cuartos de forma recursiva: cada corte agrega una
+pared (con bits en las dos celdas), una puerta cerrada sobre esa pared y, a
+veces, un hueco abierto, así que todo el edificio queda conectado. Las
+entradas van sobre el borde, sin pared hacia afuera. Los conteos de fuegos,
+POIs y bomberos escalan con el área a partir de final.txt (6x8: 10 fuegos,
+3 POIs, 6 bomberos) y las entradas con el perímetro (4).
+
+Uso:
+    python generador_mapas.py --rows 50 --cols 50 --seed 0 --output mapa_50.txt
+"""
+import argparse
+import random
+
+from motor import DELTA_WALL_BITS, WALL_BITS, parse_file, write_map_file
+
+# Cuartos de a lo más este tamaño por lado dejan de partirse
+MAX_ROOM_SIZE = 4
+# Probabilidad de dejar un hueco abierto además de la puerta en cada corte
+GAP_PROBABILITY = 0.3
+
+
+def default_counts(rows, cols):
+    """Conteos de final.txt escalados al tamaño del tablero."""
+    area = rows * cols / 48
+    return {
+        'fires': max(1, round(10 * area)),
+        'pois': max(3, round(3 * area)),
+        'firefighters': max(6, round(6 * area)),
+        'entrances': max(4, round(4 * (rows + cols) / 14)),
+    }
+
+
+def add_wall(walls, pos1, pos2):
+    """Pone la pared entre dos celdas vecinas, en ambas celdas."""
+    delta = (pos2[0] - pos1[0], pos2[1] - pos1[1])
+    walls[pos1[0]][pos1[1]] |= DELTA_WALL_BITS[delta]
+    walls[pos2[0]][pos2[1]] |= DELTA_WALL_BITS[(-delta[0], -delta[1])]
+
+
+def remove_wall(walls, pos1, pos2):
+    delta = (pos2[0] - pos1[0], pos2[1] - pos1[1])
+    walls[pos1[0]][pos1[1]] &= ~DELTA_WALL_BITS[delta]
+    walls[pos2[0]][pos2[1]] &= ~DELTA_WALL_BITS[(-delta[0], -delta[1])]
+
+
+def split_rooms(walls, doors, rng, top, left, bottom, right):
+    """Parte el cuarto [top, bottom) x [left, right) hasta que los cuartos sean chicos."""
+    pending = [(top, left, bottom, right)]
+    while pending:
+        top, left, bottom, right = pending.pop()
+        height, width = bottom - top, right - left
+        if height <= MAX_ROOM_SIZE and width <= MAX_ROOM_SIZE:
+            continue
+
+        if height >= width:
+            cut = rng.randrange(top + 1, bottom)
+            edges = [((cut - 1, col), (cut, col)) for col in range(left, right)]
+            pending += [(top, left, cut, right), (cut, left, bottom, right)]
+        else:
+            cut = rng.randrange(left + 1, right)
+            edges = [((row, cut - 1), (row, cut)) for row in range(top, bottom)]
+            pending += [(top, left, bottom, cut), (top, cut, bottom, right)]
+
+        for pos1, pos2 in edges:
+            add_wall(walls, pos1, pos2)
+        door, *rest = rng.sample(edges, min(2, len(edges)))
+        doors.append({'row1': door[0][0], 'col1': door[0][1], 'row2': door[1][0], 'col2': door[1][1], 'is_open': False})
+        if rest and rng.random() < GAP_PROBABILITY:
+            remove_wall(walls, *rest[0])
+
+
+def border_cells(rows, cols):
+    """Celdas del borde con la dirección de su pared exterior, en orden alrededor del tablero."""
+    cells = [((0, col), 'N') for col in range(cols)]
+    cells += [((row, cols - 1), 'E') for row in range(1, rows)]
+    cells += [((rows - 1, col), 'S') for col in range(cols - 2, -1, -1)]
+    cells += [((row, 0), 'W') for row in range(rows - 2, 0, -1)]
+    return cells
+
+
+def generate_map(rows, cols, seed=None, fires=None, pois=None, firefighters=None, entrances=None):
+    """Regresa (walls_grid, markers, fire_markers, doors, entrances, firefighters), igual que parse_file."""
+    rng = random.Random(seed)
+    counts = default_counts(rows, cols)
+    fires = counts['fires'] if fires is None else fires
+    pois = counts['pois'] if pois is None else pois
+    firefighters = counts['firefighters'] if firefighters is None else firefighters
+    num_entrances = counts['entrances'] if entrances is None else entrances
+
+    walls = [[0] * cols for _ in range(rows)]
+    for row in range(rows):
+        walls[row][0] |= WALL_BITS['W']
+        walls[row][cols - 1] |= WALL_BITS['E']
+    for col in range(cols):
+        walls[0][col] |= WALL_BITS['N']
+        walls[rows - 1][col] |= WALL_BITS['S']
+
+    doors = []
+    split_rooms(walls, doors, rng, 0, 0, rows, cols)
+
+    # Entradas repartidas a lo largo del borde, abiertas hacia afuera
+    border = border_cells(rows, cols)
+    num_entrances = min(num_entrances, len(border))
+    offset = rng.randrange(len(border))
+    entrance_cells = []
+    for i in range(num_entrances):
+        (row, col), side = border[(offset + i * len(border) // num_entrances) % len(border)]
+        walls[row][col] &= ~WALL_BITS[side]
+        entrance_cells.append((row, col))
+
+    # Fuegos y POIs en celdas distintas, fuera de las entradas
+    taken = set(entrance_cells)
+    free = [(row, col) for row in range(rows) for col in range(cols) if (row, col) not in taken]
+    if fires + pois > len(free):
+        raise ValueError(f"No caben {fires} fuegos y {pois} POIs en un tablero de {rows}x{cols}")
+    chosen = rng.sample(free, fires + pois)
+    markers = [
+        {'row': row, 'col': col, 'type': rng.choices(['v', 'f'], weights=[0.6, 0.4])[0], 'revealed': False}
+        for row, col in chosen[:pois]
+    ]
+    fire_markers = [{'row': row, 'col': col} for row, col in chosen[pois:]]
+    entrances = [{'row': row, 'col': col} for row, col in entrance_cells]
+    walls_grid = [[format(cell, '04b') for cell in row] for row in walls]
+    return walls_grid, markers, fire_markers, doors, entrances, firefighters
+
+
+def check_scenario(scenario):
+    """Lista de problemas del Scenario: paredes de un solo lado, puertas sin pared, fuegos o POIs fuera del
+    tablero y entradas fuera del borde."""
+    problems = []
+    rows, cols = scenario.width, scenario.height
+    walls = scenario.wall_bits
+    for row in range(rows):
+        for col in range(cols):
+            for (d_row, d_col), bit in DELTA_WALL_BITS.items():
+                other = (row + d_row, col + d_col)
+                if not (0 <= other[0] < rows and 0 <= other[1] < cols):
+                    continue
+                back = DELTA_WALL_BITS[(-d_row, -d_col)]
+                if bool(walls[row][col] & bit) != bool(walls[other[0]][other[1]] & back):
+                    problems.append(f"Pared de un solo lado entre {(row, col)} y {other}")
+
+    for door in scenario.doors:
+        pos1, pos2 = (door['row1'], door['col1']), (door['row2'], door['col2'])
+        bit = DELTA_WALL_BITS.get((pos2[0] - pos1[0], pos2[1] - pos1[1]))
+        if bit is None or not walls[pos1[0]][pos1[1]] & bit:
+            problems.append(f"Puerta sin pared entre {pos1} y {pos2}")
+
+    for kind, cells in (("Fuego", scenario.fire_markers), ("POI", scenario.markers)):
+        for cell in cells:
+            if not (0 <= cell['row'] < rows and 0 <= cell['col'] < cols):
+                problems.append(f"{kind} fuera del tablero en {(cell['row'], cell['col'])}")
+
+    for entrance in scenario.entrances:
+        row, col = entrance['row'], entrance['col']
+        if not (row in (0, rows - 1) or col in (0, cols - 1)):
+            problems.append(f"Entrada fuera del borde en {(row, col)}")
+    return problems
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Genera un edificio aleatorio para Flash Point.")
+    parser.add_argument("--rows", type=int, default=50)
+    parser.add_argument("--cols", type=int, default=50)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--fires", type=int, default=None)
+    parser.add_argument("--pois", type=int, default=None)
+    parser.add_argument("--firefighters", type=int, default=None)
+    parser.add_argument("--entrances", type=int, default=None)
+    parser.add_argument("--output", required=True)
+    args = parser.parse_args()
+
+    *parsed, firefighters = generate_map(args.rows, args.cols, args.seed, args.fires, args.pois, args.firefighters,
+                                         args.entrances)
+    write_map_file(args.output, *parsed, firefighters=firefighters)
+    scenario = parse_file(args.output, as_scenario=True)
+    problems = check_scenario(scenario)
+    for problem in problems:
+        print(problem)
+    print(f"{args.output}: {scenario.width}x{scenario.height}, {len(scenario.doors)} puertas, "
+          f"{len(scenario.entrances)} entradas, {len(scenario.fire_markers)} fuegos, "
+          f"{len(scenario.markers)} POIs, {scenario.firefighters} bomberos")
+    raise SystemExit(1 if problems else 0)
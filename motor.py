@@ -0,0 +1,1525 @@
+"""Núcleo de la simulación: BoardModel, FireFighterAgent, parse_file y los reportes.
+
+Solo importa mesa y numpy (más la biblioteca estándar), así que el servidor y
+los procesos de simulación lo cargan rápido y sin matplotlib. Los dibujos para
+el notebook están en `dibujo`; `AgentesModelo` junta los dos y carga los
+dibujos hasta que se usan.
+"""
+# %%
+from mesa import Agent, Model
+from mesa.space import MultiGrid
+from mesa.time import SimultaneousActivation
+import random
+import numpy as np
+import copy
+import functools
+import heapq
+import itertools
+import time
+from collections import deque, namedtuple
+from types import MappingProxyType
+
+# %%
+def get_distance(pos1, pos2):
+    x = pos1[0] - pos2[0]
+    y = pos1[1] - pos2[1]
+    d = np.sqrt(x**2 + y**2)
+    return d
+
+# Cada celda guarda sus paredes como un entero de 4 bits en el mismo orden que
+# la cadena "NESW" del archivo (int("0101", 2) == 0b0101). Los 4 bits altos
+# marcan las puertas abiertas en esa misma dirección.
+WALL_BITS = {'N': 0b1000, 'E': 0b0100, 'S': 0b0010, 'W': 0b0001}
+DELTA_WALL_BITS = {(-1, 0): 0b1000, (0, 1): 0b0100, (1, 0): 0b0010, (0, -1): 0b0001}
+DOOR_OPEN_SHIFT = 4
+
+def encode_walls(walls_grid):
+    """Convierte la rejilla de cadenas "0101" (o de enteros ya codificados) en una rejilla de enteros."""
+    return [[int(walls, 2) if isinstance(walls, str) else walls for walls in row] for row in walls_grid]
+
+def decode_walls(wall_bits):
+    """Exporta la rejilla de enteros al formato de cadenas "0101"."""
+    return [[format(cell & 0b1111, '04b') for cell in row] for row in wall_bits]
+
+def door_key(pos1, pos2):
+    # El par de celdas no tiene orden: (a, b) y (b, a) son la misma puerta
+    return (pos1, pos2) if pos1 <= pos2 else (pos2, pos1)
+
+def build_door_index(doors):
+    """Indexa las puertas por par de celdas; cada entrada apunta al mismo dict de `doors`."""
+    door_index = {}
+    for door in doors:
+        key = door_key((door['row1'], door['col1']), (door['row2'], door['col2']))
+        door_index.setdefault(key, door)  # Igual que la búsqueda lineal: gana la primera
+    return door_index
+
+def find_door(current_pos, next_pos, door_index):
+    return door_index.get(door_key(current_pos, next_pos))
+
+def can_move(current_pos, next_pos, wall_bits):
+    # Solo movimientos adyacentes (no diagonales)
+    bit = DELTA_WALL_BITS.get((next_pos[0] - current_pos[0], next_pos[1] - current_pos[1]))
+    if bit is None:
+        return False
+
+    cell = wall_bits[current_pos[0]][current_pos[1]]
+    # Sin pared en esa dirección, o la pared tiene una puerta abierta
+    return not cell & bit or bool(cell & (bit << DOOR_OPEN_SHIFT))
+
+def is_border_position(pos, width, height):
+    row, col = pos
+    return row == 0 or row == height - 1 or col == 0 or col == width - 1
+
+def solve_assignment(costs):
+    """Asignación de costo mínimo con el método húngaro.
+
+    `costs` es una matriz de n filas por m columnas con n <= m; regresa para
+    cada fila el índice de la columna que le toca.
+    """
+    n, m = len(costs), len(costs[0])
+    u = [0] * (n + 1)
+    v = [0] * (m + 1)
+    owner = [0] * (m + 1)  # Fila (desde 1) asignada a cada columna; la columna 0 es auxiliar
+    way = [0] * (m + 1)
+
+    for row in range(1, n + 1):
+        owner[0] = row
+        col0 = 0
+        min_slack = [float('inf')] * (m + 1)
+        used = [False] * (m + 1)
+        while owner[col0] != 0:
+            used[col0] = True
+            row0, delta, col1 = owner[col0], float('inf'), 0
+            for col in range(1, m + 1):
+                if not used[col]:
+                    slack = costs[row0 - 1][col - 1] - u[row0] - v[col]
+                    if slack < min_slack[col]:
+                        min_slack[col], way[col] = slack, col0
+                    if min_slack[col] < delta:
+                        delta, col1 = min_slack[col], col
+            for col in range(m + 1):
+                if used[col]:
+                    u[owner[col]] += delta
+                    v[col] -= delta
+                else:
+                    min_slack[col] -= delta
+            col0 = col1
+        # Recorrer el camino aumentante de regreso
+        while col0:
+            col1 = way[col0]
+            owner[col0] = owner[col1]
+            col0 = col1
+
+    assignment = [None] * n
+    for col in range(1, m + 1):
+        if owner[col]:
+            assignment[owner[col] - 1] = col - 1
+    return assignment
+
+
+# %%
+class HazardLayer:
+    """Fuego y humo del tablero con pertenencia O(1).
+
+    `fires` y `smokes` son dicts usados como conjuntos ordenados: conservan el
+    orden de inserción para exportar el estado igual que las listas de antes.
+    `frontier` guarda los fuegos que tienen humo adyacente, que son los únicos
+    que pueden convertir humo en fuego.
+    """
+    def __init__(self, neighbors):
+        self.neighbors = neighbors
+        self.fires = {}
+        self.smokes = {}
+        self.frontier = {}
+
+    def add_fire(self, pos):
+        self.fires[pos] = None
+        self.update_frontier(pos)
+
+    def remove_fire(self, pos):
+        del self.fires[pos]
+        self.frontier.pop(pos, None)
+
+    def add_smoke(self, pos):
+        self.smokes[pos] = None
+        self.update_frontier_around(pos)
+
+    def remove_smoke(self, pos):
+        del self.smokes[pos]
+        self.update_frontier_around(pos)
+
+    def update_frontier(self, pos):
+        if pos in self.fires and any(adj in self.smokes for adj in self.neighbors(pos)):
+            self.frontier[pos] = None
+        else:
+            self.frontier.pop(pos, None)
+
+    def update_frontier_around(self, pos):
+        row, col = pos
+        for adj in ((row - 1, col), (row + 1, col), (row, col - 1), (row, col + 1)):
+            if adj in self.fires:
+                self.update_frontier(adj)
+
+
+# %%
+class GameMetrics:
+    """Tiempos acumulados por fase y contadores de eventos de una partida.
+
+    BoardModel(metrics=True) envuelve sus propios métodos con `timed` y
+    `counted`; sin métricas no se envuelve nada y el modelo no paga ningún
+    costo. Las fases se anidan: "advance" incluye a las demás.
+    """
+    def __init__(self):
+        self.timers = {}
+        self.counters = {}
+
+    def timed(self, phase, func):
+        timers = self.timers
+        timers.setdefault(phase, 0.0)
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                timers[phase] += time.perf_counter() - start
+        return wrapper
+
+    def counted(self, event, func, total=False):
+        """Cuenta las llamadas a `func`, o con `total=True` suma lo que regresa."""
+        counters = self.counters
+        counters.setdefault(event, 0)
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            result = func(*args, **kwargs)
+            counters[event] += int(result) if total else 1
+            return result
+        return wrapper
+
+    def summary(self):
+        counters = dict(self.counters)
+        # Sorteos de POI que no dejaron marcador en el tablero: cayeron sobre un
+        # bombero (se revelan en el acto) o ya no quedaban celdas libres
+        counters['poi_draws_unplaced'] = counters.get('poi_draws', 0) - counters.get('pois_added', 0)
+        return {"timers": dict(self.timers), "counters": counters}
+
+
+# %%
+class POIIndex:
+    """Marcadores de POI indexados por celda.
+
+    `active` guarda el marcador sin revelar de cada celda (a lo más uno) y
+    `revealed` las víctimas ya reveladas, que solo se conservan para exportar
+    el estado; las falsas alarmas desaparecen al revelarse. `free` lista las
+    celdas sin POI activo para sortear una sin reintentos, y `free_slot` da la
+    posición de cada celda en esa lista para quitarla en O(1).
+    """
+    def __init__(self, rows, cols, markers=()):
+        self.active = {}
+        self.revealed = []
+        self.free = [(row, col) for row in range(rows) for col in range(cols)]
+        self.free_slot = {cell: slot for slot, cell in enumerate(self.free)}
+        for marker in markers:
+            self.add(dict(marker))
+
+    def add(self, marker):
+        pos = (marker['row'], marker['col'])
+        if marker['revealed']:
+            self.revealed.append(marker)
+            return
+        self.active[pos] = marker
+        self.take(pos)
+
+    def reveal(self, pos):
+        """Revela el marcador de `pos` y lo regresa (None si la celda no tiene POI activo)."""
+        marker = self.active.pop(pos, None)
+        if marker is None:
+            return None
+        marker['revealed'] = True
+        if marker['type'] == 'v':
+            self.revealed.append(marker)
+        self.free_slot[pos] = len(self.free)
+        self.free.append(pos)
+        return marker
+
+    def take(self, pos):
+        slot = self.free_slot.pop(pos, None)
+        if slot is None:
+            return
+        # Mover la última celda al hueco para no recorrer la lista
+        last = self.free.pop()
+        if last != pos:
+            self.free[slot] = last
+            self.free_slot[last] = slot
+
+    def sample_free(self, rng):
+        if not self.free:
+            return None
+        return self.free[rng.randrange(len(self.free))]
+
+    def markers(self):
+        return self.revealed + list(self.active.values())
+
+
+# %%
+# Costo en AP de cada paso del planificador: abrir una puerta cuesta 1 AP y
+# cruzarla otro; una pared necesita dos golpes de 2 AP antes de cruzarla.
+MOVE_COST = 1
+DOOR_COST = 2
+WALL_COST = 5
+
+class PathPlanner:
+    """Caminos más cortos sobre el grafo de paredes y puertas del tablero.
+
+    Para cada objetivo guarda un campo de distancias (Dijkstra desde el
+    objetivo) con el costo en AP desde cada celda. El campo de salida parte a
+    la vez de todas las salidas (`model.is_exit`) y guarda también el siguiente
+    paso de cada celda. Abrir una puerta o romper una pared solo baja costos,
+    así que los campos guardados se reparan desde esa arista (`open_edge`) en
+    vez de tirarse; `version` cuenta esos cambios para que los agentes sepan
+    cuándo rehacer su plan.
+    """
+    def __init__(self, model):
+        self.model = model
+        self.fields = {}
+        self.exit_field = None
+        self.exit_steps = None
+        self.links = {}  # Celda -> [(vecino, costo de pasar del vecino a la celda)]
+        self.version = 0
+
+    def invalidate(self):
+        self.fields.clear()
+        self.links.clear()
+        self.exit_field = None
+        self.exit_steps = None
+        self.version += 1
+
+    def open_edge(self, pos1, pos2):
+        """Repara los campos guardados después de que bajó el costo entre `pos1` y `pos2`.
+
+        Solo cambian las celdas que ahora llegan más barato al origen, y el
+        resultado es el mismo que calcular cada campo de nuevo.
+        """
+        self.links.pop(pos1, None)
+        self.links.pop(pos2, None)
+        for field in self.fields.values():
+            self.repair(field, pos1, pos2)
+        if self.exit_field is not None:
+            changed = self.repair(self.exit_field, pos1, pos2) | {pos1, pos2}
+            # El siguiente paso depende del campo de los vecinos y del costo hacia ellos
+            for pos in changed | {adj for pos in changed for adj in self.neighbors(pos)}:
+                if pos in self.exit_field:
+                    self.exit_steps[pos] = self.next_step(pos, self.exit_field)
+        self.version += 1
+
+    def forget(self, target):
+        """Suelta el campo de un objetivo que ya no se va a buscar (un POI revelado)."""
+        self.fields.pop(target, None)
+
+    def neighbors(self, pos):
+        row, col = pos
+        for adj in ((row - 1, col), (row + 1, col), (row, col - 1), (row, col + 1)):
+            if self.model.is_within_bounds(adj):
+                yield adj
+
+    def step_cost(self, pos, next_pos):
+        if can_move(pos, next_pos, self.model.wall_bits):
+            return MOVE_COST
+        if find_door(pos, next_pos, self.model.door_index):
+            return DOOR_COST
+        return WALL_COST
+
+    def incoming(self, pos):
+        links = self.links.get(pos)
+        if links is None:
+            links = self.links[pos] = [(prev, self.step_cost(prev, pos)) for prev in self.neighbors(pos)]
+        return links
+
+    def compute_field(self, sources):
+        field = {source: 0 for source in sources}
+        self.relax(field, [(0, source) for source in sources])
+        return field
+
+    def repair(self, field, pos1, pos2):
+        pending = []
+        for prev, pos in ((pos1, pos2), (pos2, pos1)):
+            if pos in field:
+                new_cost = field[pos] + self.step_cost(prev, pos)
+                if new_cost < field.get(prev, float('inf')):
+                    field[prev] = new_cost
+                    heapq.heappush(pending, (new_cost, prev))
+        return self.relax(field, pending)
+
+    def relax(self, field, pending):
+        """Dijkstra desde las celdas de `pending`; regresa las celdas cuyo costo bajó."""
+        changed = set()
+        while pending:
+            cost, pos = heapq.heappop(pending)
+            if cost > field[pos]:
+                continue
+            changed.add(pos)
+            for prev, step in self.incoming(pos):
+                new_cost = cost + step
+                if new_cost < field.get(prev, float('inf')):
+                    field[prev] = new_cost
+                    heapq.heappush(pending, (new_cost, prev))
+        return changed
+
+    def distance_field(self, target):
+        field = self.fields.get(target)
+        if field is None:
+            field = self.fields[target] = self.compute_field([target])
+        return field
+
+    def distance(self, pos, target):
+        return self.distance_field(target).get(pos, float('inf'))
+
+    def exit_distances(self):
+        if self.exit_field is None:
+            exits = [
+                (row, col)
+                for row in range(self.model.width)
+                for col in range(self.model.height)
+                if self.model.is_exit((row, col))
+            ]
+            self.exit_field = self.compute_field(exits)
+            self.exit_steps = {pos: self.next_step(pos, self.exit_field) for pos in self.exit_field}
+        return self.exit_field
+
+    def exit_step(self, pos):
+        """Siguiente celda hacia la salida más barata, o None si `pos` ya es salida."""
+        self.exit_distances()
+        return self.exit_steps.get(pos)
+
+    def next_step(self, pos, field):
+        """Vecino de `pos` en el camino más barato al origen del campo, o None si ya está ahí."""
+        if field.get(pos) == 0:
+            return None
+        best, best_cost = None, float('inf')
+        for adj in self.neighbors(pos):
+            cost = self.step_cost(pos, adj) + field.get(adj, float('inf'))
+            if cost < best_cost:
+                best, best_cost = adj, cost
+        return best
+
+    def path(self, pos, target):
+        field = self.distance_field(target)
+        path = []
+        while True:
+            pos = self.next_step(pos, field)
+            if pos is None:
+                return path
+            path.append(pos)
+
+
+# %%
+class FireFighterAgent(Agent):
+    def __init__(self, id, model, ap=4):
+        super().__init__(id, model)
+        self.ap = ap
+        self.is_carrying = False
+        self.path_to_exit = []  # Camino planeado hacia el POI asignado
+        self.plan_version = None
+        self.plan_origin = None  # Celda desde la que sigue el camino planeado
+        self.assigned_POI = None
+
+    def step(self):
+        if self.ap <= 0:
+            return
+
+        if self.is_carrying:
+            self.rescue_victim()
+        else:
+            if self.assigned_POI is None:
+                self.model.assign_POI(self)
+
+            if self.assigned_POI:
+                self.move_towards_poi()
+            else:
+                action_taken = self.extinguish_fire_or_smoke()
+                if not action_taken:
+                    self.move_randomly()
+
+    
+    def move_towards_poi(self):
+        if self.pos == self.assigned_POI:
+            self.interact_with_poi()
+            return
+
+        if not self.step_along_path(self.assigned_POI):
+            self.move_randomly()
+
+    def plan_path(self, target):
+        """Camino hacia `target` en path_to_exit; se rehace si cambió el objetivo, el tablero o la posición."""
+        planner = self.model.planner
+        if (not self.path_to_exit or self.path_to_exit[-1] != target or self.plan_version != planner.version
+                or self.plan_origin != self.pos):
+            self.path_to_exit = planner.path(self.pos, target)
+            self.plan_version = planner.version
+            self.plan_origin = self.pos
+        return self.path_to_exit
+
+    def step_along_path(self, target, move_cost=1):
+        """Da la siguiente acción del plan: moverse, abrir una puerta o golpear una pared."""
+        path = self.plan_path(target)
+        if not path:
+            return False
+
+        if self.take_step(path[0], move_cost):
+            path.pop(0)
+            self.plan_origin = self.pos
+        return True
+
+    def take_step(self, next_pos, move_cost=1):
+        """Avanza a `next_pos` si está libre; si no, abre la puerta o golpea la pared. True si se movió."""
+        can_move, door = self.can_move(self.pos, next_pos)
+        if can_move:
+            self.model.grid.move_agent(self, next_pos)
+            self.ap -= move_cost
+            return True
+        elif door is not None:
+            self.model.open_door(door)
+            self.ap -= 1
+        elif self.ap >= 2:
+            self.chop_wall(next_pos)
+        else:
+            # No alcanza para golpear la pared; se termina el turno
+            self.ap = 0
+        return False
+
+    def chop_wall(self, next_pos):
+        wall_key = self.get_wall_key(self.pos, next_pos)
+        self.model.wall_damage[wall_key] = self.model.wall_damage.get(wall_key, 0) + 1
+        self.ap -= 2
+
+        if self.model.wall_damage[wall_key] >= 2:
+            adjacent_direction = {'N': 'S', 'E': 'W', 'S': 'N', 'W': 'E'}
+            self.model.destroy_wall(self.pos, wall_key[1], next_pos, adjacent_direction[wall_key[1]])
+            self.model.total_damage += 2
+
+    def get_wall_key(self, current_pos, next_pos):
+        direction_map = {(-1, 0): 'N', (0, 1): 'E', (1, 0): 'S', (0, -1): 'W'}
+        delta = (next_pos[0] - current_pos[0], next_pos[1] - current_pos[1])
+        if delta in direction_map:
+            direction = direction_map[delta]
+            return (current_pos, direction)
+        return None
+
+    def release_victim(self):
+        """Libera la víctima en el borde."""
+        self.is_carrying = False
+        self.path_to_exit = []
+        self.model.rescued_victims += 1
+        self.model.poi_assignment_dirty = True
+
+    def rescue_victim(self):
+        if not self.is_carrying:
+            return
+
+        if self.model.is_exit(self.pos):
+            self.release_victim()
+            return
+
+        # El campo de salida da el siguiente paso directamente; cargar cuesta 2 AP por movimiento
+        next_pos = self.model.planner.exit_step(self.pos)
+        if next_pos is None:
+            self.move_randomly()
+        else:
+            self.take_step(next_pos, move_cost=2)
+
+    def interact_with_poi(self):
+        marker = self.model.pois.reveal(self.assigned_POI)
+        if marker is not None and marker['type'] == 'v':
+            self.is_carrying = True
+
+        self.model.close_POI(self.assigned_POI)
+        self.assigned_POI = None
+
+    def move_randomly(self):
+        possible_positions = self.model.grid.get_neighborhood(self.pos, moore=False, include_center=False)
+        possible_positions = list(possible_positions)
+        self.model.np_rng.shuffle(possible_positions) 
+
+        for position in possible_positions:
+            can_move, door = self.can_move(self.pos, position)
+            if can_move:
+                self.model.grid.move_agent(self, position)
+                self.ap -= 1
+                break
+            elif door is not None:
+                if self.ap >= 1:
+                    self.model.open_door(door)
+                    self.model.grid.move_agent(self, position)
+                    self.ap -= 1
+                    break
+                else:
+                    continue
+
+    def can_move(self, current_pos, next_pos):
+        bit = DELTA_WALL_BITS.get((next_pos[0] - current_pos[0], next_pos[1] - current_pos[1]))
+        if bit is None:
+            return False, None
+
+        if self.model.wall_bits[current_pos[0]][current_pos[1]] & bit:
+            # Buscar si hay una puerta entre current_pos y next_pos
+            door = self.find_door(current_pos, next_pos)
+            if door:
+                if door['is_open']:
+                    return True, door
+                else:
+                    return False, door
+            else:
+                return False, None  # Pared sin puerta
+        else:
+            return True, None  # No hay pared en esa dirección
+
+    def find_door(self, current_pos, next_pos):
+        return find_door(current_pos, next_pos, self.model.door_index)
+
+    def extinguish_fire_or_smoke(self):
+        positions_to_check = self.model.grid.get_neighborhood(self.pos, moore=False, include_center=True)
+
+        for position in positions_to_check:
+            # Extinguir completamente el fuego
+            if position in self.model.hazards.fires and self.ap >= 2:
+                self.model.hazards.remove_fire(position)
+                self.ap -= 2
+                return True
+
+        for position in positions_to_check:
+            # Convertir fuego en humo 
+            if position in self.model.hazards.fires and self.ap >= 1:
+                self.model.hazards.remove_fire(position)
+                self.model.hazards.add_smoke(position)
+                self.ap -= 1
+                return True
+
+        for position in positions_to_check:
+            # Extinguir humo
+            if position in self.model.hazards.smokes and self.ap >= 1:
+                self.model.hazards.remove_smoke(position)
+                self.ap -= 1
+                return True
+
+        return False
+
+
+# %%
+def get_grid(model):
+    grid = np.zeros((model.grid.width, model.grid.height))
+
+    for agent in model.schedule.agents:
+        x, y = agent.pos
+        grid[x][y] = 2
+
+    return grid
+
+def get_doors_state(model):
+    return copy.deepcopy(model.doors)
+
+def get_poi(model):
+    return tuple((marker['row'], marker['col'], marker['type'], marker['revealed']) for marker in model.pois.markers())
+
+def get_fires_state(model):
+    return [
+        {"row": pos[0], "col": pos[1]}
+        for pos in model.hazards.fires
+    ]
+
+def get_smokes_state(model):
+    return [
+        {"row": pos[0], "col": pos[1]}
+        for pos in model.hazards.smokes
+    ]
+
+def get_walls_state(model):
+    return decode_walls(model.wall_bits)
+
+def get_exit_distances(model):
+    """Costo en AP desde cada celda hasta la salida más cercana (filas x columnas)."""
+    field = model.planner.exit_distances()
+    return [[field.get((row, col)) for col in range(model.height)] for row in range(model.width)]
+
+class ChangeLogCollector:
+    """Guarda la partida como cambios por paso en lugar de copias del tablero.
+
+    Cada llamada a `collect` registra solo lo que cambió desde el paso anterior
+    (paredes rotas, puertas abiertas, fuegos y humos que aparecen o se apagan,
+    POIs, agentes que se movieron y contadores). Cada `keyframe_interval`
+    pasos se guarda además el estado completo, de modo que `get_state(i)`
+    reconstruye cualquier paso aplicando a lo más ese número de cambios.
+    Los estados usan las mismas llaves que los reporters de antes.
+    "ExitDistances" solo se calcula si `overlays` incluye "exit"; si no, es None.
+    """
+    def __init__(self, keyframe_interval=50, overlays=()):
+        self.keyframe_interval = keyframe_interval
+        self.overlays = tuple(overlays)
+        self.deltas = []
+        self.keyframes = {}
+        self.width = None
+        self.height = None
+        self.door_cells = []
+        self._last = None
+
+    def __len__(self):
+        return len(self.deltas)
+
+    def snapshot(self, model):
+        return {
+            "walls": [list(row) for row in model.wall_bits],
+            "doors": [door['is_open'] for door in model.doors],
+            "fires": dict(model.hazards.fires),
+            "smokes": dict(model.hazards.smokes),
+            "poi": get_poi(model),
+            "agents": {agent.unique_id: agent.pos for agent in model.schedule.agents},
+            "counters": (model.rescued_victims, model.total_damage, model.steps),
+            "exit": get_exit_distances(model) if "exit" in self.overlays else None,
+        }
+
+    def collect(self, model):
+        if self._last is None:
+            self.width, self.height = model.grid.width, model.grid.height
+            self.door_cells = [
+                (door['row1'], door['col1'], door['row2'], door['col2']) for door in model.doors
+            ]
+            self._last = self.snapshot(model)
+            self.deltas.append({})
+            self.keyframes[0] = copy.deepcopy(self._last)
+            return
+
+        last = self._last
+        delta = {"counters": (model.rescued_victims, model.total_damage, model.steps)}
+        last["counters"] = delta["counters"]
+
+        walls = []
+        for row, (current, previous) in enumerate(zip(model.wall_bits, last["walls"])):
+            if current != previous:
+                for col, bits in enumerate(current):
+                    if bits != previous[col]:
+                        walls.append((row, col, bits))
+                last["walls"][row] = list(current)
+        if walls:
+            delta["walls"] = walls
+
+        doors = [
+            (index, door['is_open'])
+            for index, door in enumerate(model.doors)
+            if door['is_open'] != last["doors"][index]
+        ]
+        for index, is_open in doors:
+            last["doors"][index] = is_open
+        if doors:
+            delta["doors"] = doors
+
+        # El campo de salida solo cambia junto con las paredes o las puertas
+        if (walls or doors) and "exit" in self.overlays:
+            delta["exit"] = last["exit"] = get_exit_distances(model)
+
+        for key, current in (("fires", model.hazards.fires), ("smokes", model.hazards.smokes)):
+            previous = last[key]
+            if current.keys() != previous.keys():
+                removed = [pos for pos in previous if pos not in current]
+                added = [pos for pos in current if pos not in previous]
+                delta[key] = (removed, added)
+                last[key] = dict(current)
+
+        poi = get_poi(model)
+        if poi != last["poi"]:
+            delta["poi"] = poi
+            last["poi"] = poi
+
+        moved = {
+            agent.unique_id: agent.pos
+            for agent in model.schedule.agents
+            if last["agents"].get(agent.unique_id) != agent.pos
+        }
+        if moved:
+            delta["agents"] = moved
+            last["agents"].update(moved)
+
+        self.deltas.append(delta)
+        if (len(self.deltas) - 1) % self.keyframe_interval == 0:
+            self.keyframes[len(self.deltas) - 1] = copy.deepcopy(last)
+
+    def apply(self, state, delta):
+        for row, col, bits in delta.get("walls", ()):
+            state["walls"][row][col] = bits
+        for index, is_open in delta.get("doors", ()):
+            state["doors"][index] = is_open
+        for key in ("fires", "smokes"):
+            if key in delta:
+                removed, added = delta[key]
+                for pos in removed:
+                    del state[key][pos]
+                for pos in added:
+                    state[key][pos] = None
+        if "poi" in delta:
+            state["poi"] = delta["poi"]
+        if "agents" in delta:
+            state["agents"].update(delta["agents"])
+        if "exit" in delta:
+            state["exit"] = delta["exit"]
+        if "counters" in delta:
+            state["counters"] = delta["counters"]
+
+    def export(self, state):
+        grid = np.zeros((self.width, self.height))
+        for x, y in state["agents"].values():
+            grid[x][y] = 2
+
+        rescued_victims, total_damage, steps = state["counters"]
+        return {
+            "Grid": grid,
+            "Doors": [
+                {'row1': row1, 'col1': col1, 'row2': row2, 'col2': col2, 'is_open': is_open}
+                for (row1, col1, row2, col2), is_open in zip(self.door_cells, state["doors"])
+            ],
+            "POI": state["poi"],
+            "Fires": [{"row": pos[0], "col": pos[1]} for pos in state["fires"]],
+            "Smokes": [{"row": pos[0], "col": pos[1]} for pos in state["smokes"]],
+            "Walls": decode_walls(state["walls"]),
+            "Agents": [{"id": agent_id, "pos": pos} for agent_id, pos in state["agents"].items()],
+            "rescued_victims": rescued_victims,
+            "total_damage": total_damage,
+            "Steps": steps,
+            "ExitDistances": state["exit"],
+        }
+
+    def get_state(self, step):
+        """Reconstruye el estado completo del paso `step` (acepta índices negativos)."""
+        if step < 0:
+            step += len(self.deltas)
+        if not 0 <= step < len(self.deltas):
+            raise IndexError(step)
+
+        start = step - step % self.keyframe_interval
+        state = copy.deepcopy(self.keyframes[start])
+        for delta in self.deltas[start + 1:step + 1]:
+            self.apply(state, delta)
+        return self.export(state)
+
+    def iter_states(self):
+        """Recorre todos los pasos en orden aplicando cada cambio una sola vez."""
+        if not self.deltas:
+            return
+        state = copy.deepcopy(self.keyframes[0])
+        yield self.export(state)
+        for delta in self.deltas[1:]:
+            self.apply(state, delta)
+            yield self.export(state)
+
+    def get_model_vars_dataframe(self):
+        # pandas solo se carga si se pide la tabla
+        import pandas as pd
+
+        return pd.DataFrame(list(self.iter_states()))
+
+
+# %%
+# Niveles de recolección de datos de BoardModel, de menor a mayor costo:
+# - "none": no se guarda nada; el resultado se lee con get_summary().
+# - "summary": solo el resumen al terminar la partida (model.summary).
+# - "turn": un resumen al final de cada turno (model.turn_summaries).
+# - "full": el registro de cambios por paso en model.datacollector.
+COLLECTION_LEVELS = ("none", "summary", "turn", "full")
+
+# Cómo se reparten los POIs entre los bomberos:
+# - "greedy": cada bombero libre toma el POI abierto más cercano en línea recta.
+# - "global" (por defecto): se resuelve la asignación completa (método húngaro)
+#   con el costo de camino cuando cambian los POIs o los bomberos libres, a lo
+#   más una vez por turno; lo que cambie a mitad de turno espera al siguiente.
+POI_POLICIES = ("greedy", "global")
+
+# Bomberos por partida cuando el mapa no dice cuántos (el juego original)
+DEFAULT_FIREFIGHTERS = 6
+
+class BoardModel(Model):
+    def __init__(self, width, height, walls, doors, entrances, markers, fire_markers,
+                 keyframe_interval=50, collection_level="full", seed=None, poi_policy="global",
+                 num_firefighters=DEFAULT_FIREFIGHTERS, metrics=False, overlays=()):
+        super().__init__()
+        # Con semilla, la partida usa generadores propios y se puede repetir sin
+        # tocar el estado global; sin semilla usa `random` y `np.random`.
+        if seed is None:
+            self.rng = random
+            self.np_rng = np.random
+        else:
+            self.rng = random.Random(seed)
+            self.np_rng = np.random.RandomState(seed)
+        self.width = width
+        self.height = height
+        self.wall_bits = encode_walls(walls)
+        # Copias propias: el modelo abre puertas y cambia POIs, y eso no debe
+        # alterar las listas con las que se creó (ni la siguiente partida)
+        self.doors = [dict(door) for door in doors]
+        self.door_index = build_door_index(self.doors)
+        self.entrances = list(entrances)
+        self.entrance_cells = {(entrance['row'], entrance['col']) for entrance in self.entrances}
+        self.pois = POIIndex(width, height, markers)
+        # Se mantienen tantos POIs activos como trae el mapa (3 en final.txt)
+        self.poi_target = len(markers)
+        self.running = True
+        self.hazards = HazardLayer(self.get_adjacent_positions)
+        self.planner = PathPlanner(self)
+        self.total_damage = 0
+        self.victory_condition_met = False
+        self.aux = 0
+        self.rescued_victims = 0
+        # POIs sin revelar: `open_POIs` sin dueño y `assigned_POIs` con el bombero que va por él
+        self.open_POIs = dict.fromkeys(self.pois.active)
+        self.assigned_POIs = {}
+        if poi_policy not in POI_POLICIES:
+            raise ValueError(f"poi_policy debe ser uno de {POI_POLICIES}")
+        self.poi_policy = poi_policy
+        self.poi_assignment_dirty = True
+        self.turn_assigned = False  # Si ya se repartieron los POIs en el turno actual
+        self.grid = MultiGrid(width, height, True)
+        self.schedule = SimultaneousActivation(self)
+        self.steps = 0
+        self.current_agent_index = 0
+        if collection_level not in COLLECTION_LEVELS:
+            raise ValueError(f"collection_level debe ser uno de {COLLECTION_LEVELS}")
+        self.collection_level = collection_level
+        # overlays=("exit",) guarda también la distancia a la salida en cada paso
+        self.datacollector = (
+            ChangeLogCollector(keyframe_interval, overlays) if collection_level == "full" else None
+        )
+        self.turn_summaries = []
+        self.summary = None
+
+        # Inicializar el diccionario para rastrear el daño de las paredes
+        self.wall_damage = {}
+        for row in range(self.width):
+            for col in range(self.height):
+                walls = self.wall_bits[row][col]
+                for direction, bit in WALL_BITS.items():
+                    if walls & bit:
+                        self.wall_damage[((row, col), direction)] = 0  # Daño inicial: 0
+
+        # Reflejar en los bits las puertas que ya vienen abiertas
+        for door in self.doors:
+            if door['is_open']:
+                self.open_door(door)
+
+
+        # Crear todos los agentes y agregarlos a la lista de agentes por añadir
+        self.agents_to_add = []
+        for i in range(num_firefighters):
+            agent = FireFighterAgent(i, self)
+            self.agents_to_add.append(agent)
+
+        # Inicializar posiciones de fuego
+        for fire in fire_markers:
+            position = (fire['row'], fire['col'])
+            if self.is_within_bounds(position):
+                self.hazards.add_fire(position)
+
+        self.metrics = None
+        if metrics:
+            self.metrics = GameMetrics()
+            self.instrument()
+
+    def instrument(self):
+        """Envuelve las fases y los eventos que mide `self.metrics` (ver GameMetrics)."""
+        metrics = self.metrics
+        self.advance = metrics.timed('advance', self.advance)
+        self.collect = metrics.timed('collect', self.collect)
+        self.add_smoke = metrics.timed('add_smoke', self.add_smoke)
+        self.fill_pois = metrics.timed('fill_pois', self.fill_pois)
+        self.solve_POI_assignment = metrics.timed('poi_assignment', self.solve_POI_assignment)
+        self.handle_explosion = metrics.timed('explosion', metrics.counted('explosions', self.handle_explosion))
+        self.propagate_shockwave = metrics.counted('shockwaves', self.propagate_shockwave)
+        self.propagate_shockwave = metrics.counted('shockwave_cells', self.propagate_shockwave, total=True)
+        self.process_fire_adjacent_smoke = metrics.counted(
+            'flashover_conversions', self.process_fire_adjacent_smoke, total=True)
+        self.destroy_wall = metrics.counted('walls_broken', self.destroy_wall, total=True)
+        self.open_door = metrics.counted('doors_opened', self.open_door)
+        self.generate_random_poi = metrics.counted('poi_draws', self.generate_random_poi)
+        self.add_POI = metrics.counted('pois_added', self.add_POI)
+        for agent in self.agents_to_add:
+            agent.step = metrics.timed('agent_step', agent.step)
+            agent.move_randomly = metrics.counted('random_moves', agent.move_randomly)
+            agent.chop_wall = metrics.counted('wall_chops', agent.chop_wall)
+
+    def get_metrics(self):
+        """Resumen de tiempos y contadores de la partida, o None si se creó sin métricas."""
+        if self.metrics is None:
+            return None
+        return dict(self.metrics.summary(), steps=self.steps)
+    
+    @classmethod
+    def from_scenario(cls, scenario, **kwargs):
+        """Crea una partida nueva a partir de un Scenario compartido."""
+        kwargs.setdefault('num_firefighters', scenario.firefighters)
+        return cls(
+            scenario.width, scenario.height, scenario.wall_bits, scenario.doors,
+            scenario.entrances, scenario.markers, scenario.fire_markers, **kwargs
+        )
+
+    def assign_POI(self, agent):
+        if self.poi_policy == "global":
+            self.refresh_POI_assignment()
+            return agent.assigned_POI
+
+        if not self.open_POIs:
+            return None  # No hay POIs disponibles
+
+        # Encontrar el POI más cercano
+        closest_POI = min(
+            self.open_POIs,
+            key=lambda poi: get_distance(agent.pos, poi)
+        )
+
+        # Asignar el POI al agente
+        self.claim_POI(closest_POI, agent)
+        return closest_POI
+
+    def refresh_POI_assignment(self):
+        """Con la política global, reparte de nuevo si hace falta y no se hizo ya en este turno."""
+        if self.poi_assignment_dirty and not self.turn_assigned:
+            self.solve_POI_assignment()
+            self.turn_assigned = True
+
+    def solve_POI_assignment(self):
+        """Reparte los POIs sin revelar entre los bomberos libres con el menor costo total de camino."""
+        self.poi_assignment_dirty = False
+        agents = [agent for agent in self.schedule.agents if not agent.is_carrying]
+        for agent in agents:
+            agent.assigned_POI = None
+        self.open_POIs.update(dict.fromkeys(self.assigned_POIs))
+        self.assigned_POIs.clear()
+        if not agents or not self.open_POIs:
+            return
+
+        pois = list(self.open_POIs)
+        # Los campos de los POIs se guardan entre turnos y solo se reparan cuando cambia una pared o puerta
+        fields = [self.planner.distance_field(poi) for poi in pois]
+        costs = [[field.get(agent.pos, float('inf')) for field in fields] for agent in agents]
+        if len(agents) <= len(pois):
+            pairs = [(agent, pois[col]) for agent, col in zip(agents, solve_assignment(costs))]
+        else:
+            # Más bomberos que POIs: se resuelve por POI y los demás quedan libres
+            costs = [list(column) for column in zip(*costs)]
+            pairs = [(agents[row], poi) for poi, row in zip(pois, solve_assignment(costs))]
+        for agent, poi in pairs:
+            self.claim_POI(poi, agent)
+
+    def claim_POI(self, poi, agent):
+        del self.open_POIs[poi]
+        self.assigned_POIs[poi] = agent
+        agent.assigned_POI = poi
+
+    def add_POI(self, marker):
+        self.pois.add(marker)
+        self.open_POIs[(marker['row'], marker['col'])] = None
+        self.poi_assignment_dirty = True
+
+    def close_POI(self, poi):
+        """Saca un POI revelado de los conjuntos de abiertos y asignados."""
+        self.open_POIs.pop(poi, None)
+        self.assigned_POIs.pop(poi, None)
+        self.planner.forget(poi)
+        self.poi_assignment_dirty = True
+
+    def add_smoke(self):
+        random_row = self.rng.randint(0, self.width - 1)
+        random_col = self.rng.randint(0, self.height - 1)
+        random_pos = (random_row, random_col)
+        if not self.is_within_bounds(random_pos):
+            return
+
+        # 1. Verificar si el humo se añade en una posición con fuego
+        if random_pos in self.hazards.fires:
+            self.handle_explosion(random_pos)
+            return
+
+        # 2. Verificar si ya hay un humo en esa posición
+        if random_pos in self.hazards.smokes:
+            # Eliminar el humo existente
+            self.hazards.remove_smoke(random_pos)
+            # Añadir fuego en esta posición
+            self.hazards.add_fire(random_pos)
+            return
+
+        # 3. Verificar si la posición está adyacente a algún fuego con conexión válida
+        adjacent_positions = self.get_adjacent_positions(random_pos)
+        for adj in adjacent_positions:
+            if not self.is_within_bounds(adj):
+                continue
+            if adj in self.hazards.fires:
+                # Verificar si hay una pared o una puerta cerrada entre random_pos y adj
+                can_comm = can_move(random_pos, adj, self.wall_bits)
+                if can_comm:
+                    # Añadir fuego en esta posición
+                    self.hazards.add_fire(random_pos)
+                    return
+
+        # 4. Si ninguna de las condiciones anteriores se cumple, añadir el humo
+        self.hazards.add_smoke(random_pos)
+
+    def get_adjacent_positions(self, pos):
+        row, col = pos
+        adjacent = []
+        
+        if row > 0:
+            adjacent.append((row - 1, col))
+        # width es el número de filas y height el de columnas
+        if row < self.width - 1:
+            adjacent.append((row + 1, col))
+        if col > 0:
+            adjacent.append((row, col - 1))
+        if col < self.height - 1:
+            adjacent.append((row, col + 1))
+        
+        return adjacent
+
+    def handle_explosion(self, pos):
+        directions = [(-1, 0, 'N', 'S'), (1, 0, 'S', 'N'), (0, -1, 'W', 'E'), (0, 1, 'E', 'W')]
+
+        for d_row, d_col, dir_current, dir_adjacent in directions:
+            next_pos = (pos[0] + d_row, pos[1] + d_col)
+
+            if not self.is_within_bounds(next_pos):
+                continue
+
+            # Si hay una pared o puerta, dañarla
+            if not can_move(pos, next_pos, self.wall_bits):
+                wall_key = ((pos[0], pos[1]), dir_current)
+                if wall_key in self.wall_damage:
+                    self.wall_damage[wall_key] += 1
+                    if self.wall_damage[wall_key] >= 2:
+                        self.destroy_wall(pos, dir_current, next_pos, dir_adjacent)
+                        self.total_damage += 2
+                else:
+                    door = find_door(pos, next_pos, self.door_index)
+                    if door and not door['is_open']:
+                        self.destroy_door(door)
+                        self.total_damage += 1
+                continue
+
+            # Propagar fuego a una celda válida
+            if next_pos in self.hazards.smokes:
+                self.hazards.remove_smoke(next_pos)
+                self.hazards.add_fire(next_pos)
+            elif next_pos in self.hazards.fires:
+                # propagar fuego en línea recta
+                self.propagate_shockwave(next_pos, d_row, d_col, dir_current, dir_adjacent)
+            else:
+                # Propagar fuego a una celda vacía
+                self.hazards.add_fire(next_pos)
+
+        self.process_fire_adjacent_smoke()
+    
+    def propagate_shockwave(self, start_pos, d_row, d_col, dir_current, dir_adjacent):
+        current_pos = start_pos
+        # Celdas que recorre la onda, para las métricas
+        length = 0
+
+        while True:
+            next_pos = (current_pos[0] + d_row, current_pos[1] + d_col)
+
+            if not self.is_within_bounds(next_pos):
+                break
+
+            # Verificar si hay una puerta o pared bloqueando
+            if not can_move(current_pos, next_pos, self.wall_bits):
+                # Daño a la pared, si aplica
+                wall_key = ((current_pos[0], current_pos[1]), dir_current)
+                if wall_key in self.wall_damage:
+                    self.wall_damage[wall_key] += 1
+                    if self.wall_damage[wall_key] >= 2:
+                        self.destroy_wall(current_pos, dir_current, next_pos, dir_adjacent)
+                        self.total_damage += 2
+                else:
+                    door = find_door(current_pos, next_pos, self.door_index)
+                    if door and not door['is_open']:
+                        self.destroy_door(door)
+                        self.total_damage += 1
+                break
+
+            length += 1
+            if next_pos in self.hazards.fires:
+                # Continuar propagación si ya hay fuego
+                current_pos = next_pos
+                continue
+
+            if next_pos in self.hazards.smokes:
+                # Convertir humo en fuego y continuar
+                self.hazards.remove_smoke(next_pos)
+                self.hazards.add_fire(next_pos)
+                current_pos = next_pos
+            else:
+                # Propagar fuego a celda vacía y detener
+                self.hazards.add_fire(next_pos)
+                break
+        return length
+
+    @property
+    def markers(self):
+        return self.pois.markers()
+
+    @property
+    def walls_grid(self):
+        return decode_walls(self.wall_bits)
+
+    @property
+    def fire_positions(self):
+        return list(self.hazards.fires)
+
+    @property
+    def smoke_positions(self):
+        return list(self.hazards.smokes)
+
+    def open_door(self, door):
+        door['is_open'] = True
+        pos1 = (door['row1'], door['col1'])
+        pos2 = (door['row2'], door['col2'])
+        bit = DELTA_WALL_BITS.get((pos2[0] - pos1[0], pos2[1] - pos1[1]))
+        if bit is None or not self.is_within_bounds(pos1) or not self.is_within_bounds(pos2):
+            return
+        # Marcar la puerta abierta en ambas celdas
+        self.wall_bits[pos1[0]][pos1[1]] |= bit << DOOR_OPEN_SHIFT
+        self.wall_bits[pos2[0]][pos2[1]] |= DELTA_WALL_BITS[(pos1[0] - pos2[0], pos1[1] - pos2[1])] << DOOR_OPEN_SHIFT
+        self.planner.open_edge(pos1, pos2)
+
+    def destroy_door(self, door):
+        self.open_door(door)
+
+
+    def destroy_wall(self, current_pos, dir_current, adjacent_pos, dir_adjacent):
+        if not self.is_within_bounds(current_pos) or not self.is_within_bounds(adjacent_pos):
+            return False
+
+        # Quitar la pared en ambas celdas
+        self.wall_bits[current_pos[0]][current_pos[1]] &= ~WALL_BITS[dir_current]
+        self.wall_bits[adjacent_pos[0]][adjacent_pos[1]] &= ~WALL_BITS[dir_adjacent]
+        self.planner.open_edge(current_pos, adjacent_pos)
+        return True
+
+    def is_within_bounds(self, pos):
+        row, col = pos
+        return 0 <= row < self.width and 0 <= col < self.height
+
+    def is_exit(self, pos):
+        """Una víctima sale por una entrada o por una celda del borde sin pared hacia afuera."""
+        if pos in self.entrance_cells:
+            return True
+        # width es el número de filas y height el de columnas
+        if not is_border_position(pos, self.height, self.width):
+            return False
+
+        row, col = pos
+        walls = self.wall_bits[row][col]
+        return (
+            (row == 0 and not walls & WALL_BITS['N'])
+            or (col == self.height - 1 and not walls & WALL_BITS['E'])
+            or (row == self.width - 1 and not walls & WALL_BITS['S'])
+            or (col == 0 and not walls & WALL_BITS['W'])
+        )
+
+    def process_fire_adjacent_smoke(self):
+        # Recorrido en anchura desde la frontera: cada humo que se convierte en
+        # fuego entra una sola vez a la cola para propagar a sus vecinos.
+        pending = deque(self.hazards.frontier)
+        converted = 0
+
+        while pending:
+            fire_pos = pending.popleft()
+            for adj in self.get_adjacent_positions(fire_pos):
+                if adj in self.hazards.smokes:
+                    # Verificar si hay una pared o una puerta cerrada entre fire_pos y adj
+                    if can_move(fire_pos, adj, self.wall_bits):
+                        # Convertir humo en fuego
+                        self.hazards.remove_smoke(adj)
+                        self.hazards.add_fire(adj)
+                        pending.append(adj)
+                        converted += 1
+        return converted
+
+    def check_termination_conditions(self):
+        if self.rescued_victims >= 7:
+            return True
+        elif self.total_damage >= 24:
+            return True
+        return False
+
+    def step(self):
+        """Avanza una sola acción (o el cierre de un turno) y recolecta datos."""
+        if self.check_termination_conditions():
+            self.running = False
+            return
+        self.advance()
+        self.collect()
+
+    def step_turn(self, collect_actions=False, max_steps=None):
+        """Juega el resto del turno del agente actual y recolecta una sola vez al final.
+
+        Con `collect_actions=True` se recolecta después de cada acción, igual que
+        con `step()`; solo hace falta para animar la partida. Con `max_steps` el
+        turno se corta en cuanto `self.steps` llega a ese límite.
+        """
+        if self.play_turn(collect_actions, max_steps):
+            self.collect()
+
+    def step_round(self, collect_actions=False, max_steps=None):
+        """Juega un turno de cada bombero y recolecta una sola vez al final.
+
+        Con `max_steps` la ronda se corta en cuanto `self.steps` llega a ese
+        límite, así que la partida nunca pasa de `max_steps` pasos.
+        """
+        pending = False
+        for _ in range(len(self.agents_to_add)):
+            pending = self.play_turn(collect_actions, max_steps) or pending
+            if not self.running or self.reached(max_steps):
+                break
+        if pending:
+            self.collect()
+
+    def reached(self, max_steps):
+        return max_steps is not None and self.steps >= max_steps
+
+    def play_turn(self, collect_actions, max_steps=None):
+        """Avanza hasta cerrar el turno actual o llegar a `max_steps`; regresa True si quedaron cambios sin recolectar."""
+        pending = False
+        while not self.check_termination_conditions():
+            if self.reached(max_steps):
+                return pending
+            turn_over = self.advance()
+            pending = True
+            if collect_actions:
+                self.collect()
+                pending = False
+            if turn_over:
+                return pending
+        self.running = False
+        return pending
+
+    def advance(self):
+        """Una acción del agente actual, o el cierre de su turno si ya no tiene AP.
+
+        No revisa la terminación ni recolecta datos; regresa True si el turno terminó.
+        """
+        turn_over = True
+        # Verificar si aún hay agentes por añadir y si el agente actual ha terminado su turno
+        if self.current_agent_index < len(self.agents_to_add):
+            # Verificar si el agente actual ya está en el scheduler
+            if self.current_agent_index >= len(self.schedule.agents):
+                # Obtener el siguiente agente a añadir
+                agent_to_add = self.agents_to_add[self.current_agent_index]
+
+                entrance = self.entrances[self.aux]
+                entrance_pos = (entrance['row'], entrance['col'])
+
+                # Validar que la posición de la entrada esté dentro de los límites del grid
+                if 0 <= entrance_pos[0] < self.width and 0 <= entrance_pos[1] < self.height:
+                    self.grid.place_agent(agent_to_add, entrance_pos)
+                    self.schedule.add(agent_to_add)
+                    self.poi_assignment_dirty = True
+
+        # Verificar si hay un agente activo
+        if self.current_agent_index < len(self.schedule.agents):
+            # Obtener el agente actual
+            current_agent = self.schedule.agents[self.current_agent_index]
+
+            # Verificar si el agente tiene AP disponible
+            if current_agent.ap > 0:
+                # Con la política global, repartir de nuevo si cambiaron los POIs o los bomberos libres
+                if self.poi_policy == "global":
+                    self.refresh_POI_assignment()
+                # El agente realiza una acción
+                current_agent.step()
+                turn_over = False
+            else:
+                self.add_smoke()
+                current_agent.ap = 4
+                self.turn_assigned = False
+                # Pasar al siguiente agente
+                if self.current_agent_index < len(self.agents_to_add) - 1:
+                    self.current_agent_index += 1
+                else:
+                    self.current_agent_index = 0
+                if self.aux < len(self.entrances) - 1:
+                    self.aux += 1
+                else:
+                    self.aux = 0
+
+                # Revisar y rellenar POIs si es necesario
+                self.fill_pois()
+
+                if self.collection_level == "turn":
+                    self.turn_summaries.append(self.get_summary())
+
+        self.steps += 1
+        return turn_over
+
+    def collect(self):
+        if self.datacollector is not None:
+            self.datacollector.collect(self)
+        if self.collection_level != "none" and self.check_termination_conditions():
+            self.summary = self.get_summary()
+
+    def get_summary(self):
+        return {
+            "rescued_victims": self.rescued_victims,
+            "total_damage": self.total_damage,
+            "steps": self.steps,
+            "victory": self.rescued_victims >= 7,
+        }
+
+    def fill_pois(self):
+        # Contar los POIs activos y agentes que están cargando víctimas
+        active_pois = len(self.pois.active) + sum(
+            1 for agent in self.schedule.agents
+            if isinstance(agent, FireFighterAgent) and agent.is_carrying
+        )
+
+        # Si hay menos de los que trae el mapa, rellenar con nuevos POIs
+        while active_pois < self.poi_target:
+            new_poi = self.generate_random_poi()
+            if new_poi is None:
+                break  # No quedan celdas libres
+            # Si hay un agente en la posición del POI, revelar el POI de inmediato
+            if any(agent.pos == (new_poi['row'], new_poi['col']) for agent in self.schedule.agents):
+                if new_poi['type'] == 'f':  # Falsa alarma
+                    continue  # No se añade al mapa
+                else:
+                    # Si es una víctima, se considera parte de los POIs activos
+                    active_pois += 1
+            else:
+                self.add_POI(new_poi)
+                active_pois += 1
+
+    def generate_random_poi(self):
+        # Sortear directamente entre las celdas sin POI activo
+        position = self.pois.sample_free(self.rng)
+        if position is None:
+            return None
+
+        # Si hay fuego o humo en la posición, eliminarlo
+        if position in self.hazards.fires:
+            self.hazards.remove_fire(position)
+        elif position in self.hazards.smokes:
+            self.hazards.remove_smoke(position)
+
+        # Crear un nuevo POI
+        return {
+            'row': position[0],
+            'col': position[1],
+            'type': self.rng.choices(['v', 'f'], weights=[0.6, 0.4])[0],  # 40% real, 60% false
+            'revealed': False
+        }
+
+
+
+# %%
+class Scenario(namedtuple('Scenario', ['width', 'height', 'wall_bits', 'markers', 'fire_markers', 'doors', 'entrances',
+                                       'firefighters'], defaults=(DEFAULT_FIREFIGHTERS,))):
+    """Tablero leído de un archivo, inmutable para compartirlo entre partidas.
+
+    Las paredes ya vienen codificadas en bits y cada registro es un
+    MappingProxyType de solo lectura; BoardModel copia lo que modifica.
+    """
+    __slots__ = ()
+
+    @classmethod
+    def from_parsed(cls, walls, markers, fire_markers, doors, entrances, firefighters=DEFAULT_FIREFIGHTERS):
+        wall_bits = tuple(tuple(row) for row in encode_walls(walls))
+        return cls.frozen(wall_bits, markers, fire_markers, doors, entrances, firefighters)
+
+    @classmethod
+    def frozen(cls, wall_bits, markers, fire_markers, doors, entrances, firefighters=DEFAULT_FIREFIGHTERS):
+        """Scenario a partir de las paredes ya codificadas y registros como dicts."""
+        def freeze(records):
+            return tuple(MappingProxyType(dict(record)) for record in records)
+
+        return cls(
+            len(wall_bits), len(wall_bits[0]), wall_bits,
+            freeze(markers), freeze(fire_markers), freeze(doors), freeze(entrances), firefighters
+        )
+
+    def __reduce__(self):
+        # MappingProxyType no se puede serializar: se manda como dicts y se vuelve a congelar
+        records = [[dict(record) for record in records]
+                   for records in (self.markers, self.fire_markers, self.doors, self.entrances)]
+        return (Scenario.frozen, (self.wall_bits, *records, self.firefighters))
+
+
+# Encabezado opcional del archivo de mapa, por ejemplo:
+#   flashpoint rows=50 cols=50 pois=12 fires=110 doors=96 entrances=8 firefighters=24
+# Cada conteo dice cuántas líneas ocupa su sección. Sin encabezado se usan los
+# conteos fijos del formato original de final.txt.
+MAP_HEADER = 'flashpoint'
+LEGACY_MAP_COUNTS = {'rows': 6, 'pois': 3, 'fires': 10, 'doors': 8, 'entrances': 4, 'firefighters': DEFAULT_FIREFIGHTERS}
+
+def read_map_header(lines):
+    """Regresa los conteos de cada sección y el índice de la primera línea de paredes."""
+    counts = dict(LEGACY_MAP_COUNTS)
+    words = lines[0].split() if lines else []
+    if not words or words[0] != MAP_HEADER:
+        return counts, 0
+
+    for word in words[1:]:
+        key, _, value = word.partition('=')
+        if key not in counts and key != 'cols':
+            raise ValueError(f"Campo desconocido en el encabezado del mapa: {key}")
+        counts[key] = int(value)
+    return counts, 1
+
+
+def parse_file(filename, as_scenario=False):
+    with open(filename, 'r') as file:
+        lines = file.read().splitlines()
+    counts, start = read_map_header(lines)
+    lines = iter(lines[start:])
+
+    def section(name):
+        # Cada sección ocupa exactamente `counts[name]` líneas; las vacías se saltan
+        return [line.split() for line in itertools.islice(lines, counts[name]) if line.strip()]
+
+    # Leer las filas de paredes
+    walls_grid = [line.split() for line in itertools.islice(lines, counts['rows'])]
+    if 'cols' in counts and any(len(walls) != counts['cols'] for walls in walls_grid):
+        raise ValueError(f"Cada fila de paredes debe tener {counts['cols']} celdas")
+    # Leer los marcadores de POI
+    markers = [
+        {'row': int(row) - 1, 'col': int(col) - 1, 'type': marker_type, 'revealed': False}
+        for row, col, marker_type in section('pois')
+    ]
+    # Leer los marcadores de fuego
+    fire_markers = [{'row': int(row) - 1, 'col': int(col) - 1} for row, col in section('fires')]
+    # Leer las puertas
+    doors = [
+        {
+            'row1': int(row1) - 1,
+            'col1': int(col1) - 1,
+            'row2': int(row2) - 1,
+            'col2': int(col2) - 1,
+            'is_open': False  # Por defecto, las puertas están cerradas
+        }
+        for row1, col1, row2, col2 in section('doors')
+    ]
+    # Leer las entradas
+    entrances = [{'row': int(row) - 1, 'col': int(col) - 1} for row, col in section('entrances')]
+
+    if as_scenario:
+        return Scenario.from_parsed(walls_grid, markers, fire_markers, doors, entrances, counts['firefighters'])
+    return walls_grid, markers, fire_markers, doors, entrances
+
+
+def write_map_file(filename, walls_grid, markers, fire_markers, doors, entrances, firefighters=DEFAULT_FIREFIGHTERS):
+    """Escribe un mapa con encabezado; las coordenadas van en base 1, como en final.txt."""
+    walls_grid = decode_walls(encode_walls(walls_grid))
+    header = {
+        'rows': len(walls_grid), 'cols': len(walls_grid[0]), 'pois': len(markers), 'fires': len(fire_markers),
+        'doors': len(doors), 'entrances': len(entrances), 'firefighters': firefighters,
+    }
+    lines = [' '.join([MAP_HEADER] + [f"{key}={value}" for key, value in header.items()])]
+    lines += [' '.join(row) for row in walls_grid]
+    lines += [f"{marker['row'] + 1} {marker['col'] + 1} {marker['type']}" for marker in markers]
+    lines += [f"{fire['row'] + 1} {fire['col'] + 1}" for fire in fire_markers]
+    lines += [f"{door['row1'] + 1} {door['col1'] + 1} {door['row2'] + 1} {door['col2'] + 1}" for door in doors]
+    lines += [f"{entrance['row'] + 1} {entrance['col'] + 1}" for entrance in entrances]
+    with open(filename, 'w') as file:
+        file.write('\n'.join(lines) + '\n')
@@ -0,0 +1,623 @@
+"""Motor vectorizado: miles de partidas del mismo escenario avanzando a la vez.
+
+`BoardBatch` guarda B tableros como arreglos de NumPy (bits de paredes y
+puertas, fuego, humo, daño de paredes, POIs, bomberos y sus AP) y en cada
+`tick` avanza una acción en cada tablero que sigue en juego, igual que
+`BoardModel.advance`. Las reglas (humo, explosiones, ondas expansivas,
+flashover, caminos con costo en AP, asignación global de POIs y salidas)
+son las mismas, incluidas sus rarezas de coordenadas; lo que cambia es el
+orden en que se consumen los números aleatorios, así que las partidas no son
+idénticas una a una sino en distribución. `compare_outcomes` lo revisa con
+pruebas de Kolmogorov-Smirnov y de proporciones contra `simulacion_lote`.
+
+Uso:
+    python motor_vectorizado.py --games 100000 --seed 0
+    python motor_vectorizado.py --check 2000
+"""
+import argparse
+import math
+import time
+
+import numpy as np
+import pandas as pd
+
+from motor import DOOR_COST, DOOR_OPEN_SHIFT, MOVE_COST, WALL_BITS, WALL_COST, parse_file
+
+# Direcciones en el orden en que las recorre BoardModel: N, S, W, E
+DELTAS = ((-1, 0), (1, 0), (0, -1), (0, 1))
+WALL_BIT = np.array([WALL_BITS[name] for name in 'NSWE'], dtype=np.uint8)
+OPEN_BIT = WALL_BIT << DOOR_OPEN_SHIFT
+OPPOSITE = np.array([1, 0, 3, 2])
+# Vecindad de von Neumann con centro en el orden de MultiGrid.get_neighborhood
+EXTINGUISH_DELTAS = ((-1, 0), (0, -1), (0, 0), (0, 1), (1, 0))
+
+# Las mismas constantes que usa BoardModel
+AP_PER_TURN = 4
+VICTORY_RESCUES = 7
+MAX_DAMAGE = 24
+VICTIM_PROBABILITY = 0.6
+
+INF = 10**6
+
+RESULT_COLUMNS = ["victory", "rescued_victims", "total_damage", "steps"]
+
+
+def solve_assignments(costs):
+    """El método húngaro de `motor.solve_assignment` para muchas matrices a la vez.
+
+    `costs` tiene forma (B, n, m) con n <= m; regresa un arreglo (B, n) con la
+    columna de cada fila. Cada fila se agrega con su camino aumentante igual
+    que en la versión de listas, pero los pasos se dan en todos los tableros
+    al mismo tiempo y cada uno sale del ciclo cuando termina su camino.
+    """
+    costs = np.asarray(costs, dtype=np.int64)
+    num, n, m = costs.shape
+    everyone = np.arange(num)
+    u = np.zeros((num, n + 1), dtype=np.int64)
+    v = np.zeros((num, m + 1), dtype=np.int64)
+    owner = np.zeros((num, m + 1), dtype=int)  # Fila (desde 1) asignada a cada columna; la columna 0 es auxiliar
+    way = np.zeros((num, m + 1), dtype=int)
+    unreachable = np.iinfo(np.int64).max // 4
+
+    for row in range(1, n + 1):
+        owner[:, 0] = row
+        col0 = np.zeros(num, dtype=int)
+        min_slack = np.full((num, m + 1), unreachable)
+        used = np.zeros((num, m + 1), dtype=bool)
+        boards = everyone
+        while len(boards):
+            used[boards, col0[boards]] = True
+            row0 = owner[boards, col0[boards]]
+            slack = costs[boards, row0 - 1] - u[boards, row0][:, None] - v[boards, 1:]
+            free = ~used[boards, 1:]
+            better = free & (slack < min_slack[boards, 1:])
+            min_slack[boards, 1:] = np.where(better, slack, min_slack[boards, 1:])
+            way[boards, 1:] = np.where(better, col0[boards][:, None], way[boards, 1:])
+            candidates = np.where(free, min_slack[boards, 1:], unreachable)
+            col1 = np.argmin(candidates, axis=1) + 1
+            delta = candidates[np.arange(len(boards)), col1 - 1][:, None]
+
+            taken = used[boards]
+            np.add.at(u, (np.repeat(boards, m + 1), owner[boards].ravel()), np.where(taken, delta, 0).ravel())
+            v[boards] -= np.where(taken, delta, 0)
+            min_slack[boards] -= np.where(taken, 0, delta)
+            col0[boards] = col1
+            boards = boards[owner[boards, col1] != 0]
+
+        # Recorrer el camino aumentante de regreso
+        boards = everyone
+        while len(boards):
+            col1 = way[boards, col0[boards]]
+            owner[boards, col0[boards]] = owner[boards, col1]
+            col0[boards] = col1
+            boards = boards[col1 != 0]
+
+    rows, cols = np.nonzero(owner[:, 1:])
+    result = np.zeros((num, n), dtype=int)
+    result[rows, owner[rows, cols + 1] - 1] = cols
+    return result
+
+
+class BoardBatch:
+    """B partidas de un Scenario en arreglos de NumPy, con máscara de terminación por tablero.
+
+    Las celdas se numeran por filas (`row * cols + col`); los arreglos por
+    dirección siguen el orden N, S, W, E. Solo implementa la política de POIs
+    "global", la que usa BoardModel por defecto.
+    """
+    def __init__(self, scenario, num_boards, rng=None, max_steps=600):
+        self.rng = rng if rng is not None else np.random.default_rng()
+        self.max_steps = max_steps
+        # Igual que BoardModel: `width` son las filas y `height` las columnas
+        self.rows, self.cols = rows, cols = scenario.width, scenario.height
+        self.num_cells = num_cells = rows * cols
+        self.num_boards = num_boards
+        cell_rows, cell_cols = np.divmod(np.arange(num_cells), cols)
+        self.cell_rows, self.cell_cols = cell_rows, cell_cols
+
+        self.neighbors = np.full((num_cells, 4), -1)
+        for d, (d_row, d_col) in enumerate(DELTAS):
+            inside = (0 <= cell_rows + d_row) & (cell_rows + d_row < rows) & (0 <= cell_cols + d_col) & (cell_cols + d_col < cols)
+            self.neighbors[inside, d] = (cell_rows + d_row)[inside] * cols + (cell_cols + d_col)[inside]
+        self.safe_neighbors = np.where(self.neighbors < 0, 0, self.neighbors)
+        # Vecinos según get_adjacent_positions: los cuatro lados dentro del tablero
+        self.adjacent = self.neighbors >= 0
+        # La vecindad de las acciones de apagar es toroidal, como la de MultiGrid(torus=True)
+        self.extinguish_cells = np.stack([
+            ((cell_rows + d_row) % rows) * cols + (cell_cols + d_col) % cols
+            for d_row, d_col in EXTINGUISH_DELTAS
+        ], axis=1)
+
+        self.door_edges = np.zeros((num_cells, 4), dtype=bool)
+        open_doors = []
+        for door in scenario.doors:
+            pos1, pos2 = (door['row1'], door['col1']), (door['row2'], door['col2'])
+            for a, b in ((pos1, pos2), (pos2, pos1)):
+                delta = (b[0] - a[0], b[1] - a[1])
+                if delta in DELTAS and 0 <= a[0] < rows and 0 <= a[1] < cols and 0 <= b[0] < rows and 0 <= b[1] < cols:
+                    self.door_edges[a[0] * cols + a[1], DELTAS.index(delta)] = True
+                    if door['is_open']:
+                        open_doors.append((a[0] * cols + a[1], DELTAS.index(delta)))
+
+        self.entrances = np.array([entrance['row'] * cols + entrance['col'] for entrance in scenario.entrances])
+        self.entrance_mask = np.zeros(num_cells, dtype=bool)
+        self.entrance_mask[self.entrances] = True
+
+        walls = np.array(scenario.wall_bits, dtype=np.uint8).reshape(num_cells)
+        for cell, d in open_doors:
+            walls[cell] |= OPEN_BIT[d]
+        self.walls = np.tile(walls, (num_boards, 1))
+        self.has_wall_key = (self.walls[:, :, None] & WALL_BIT) != 0
+        self.wall_damage = np.zeros((num_boards, num_cells, 4), dtype=np.int16)
+
+        self.fire = np.zeros((num_boards, num_cells), dtype=bool)
+        self.smoke = np.zeros((num_boards, num_cells), dtype=bool)
+        for fire in scenario.fire_markers:
+            # Mismo filtro que BoardModel.__init__: solo fuegos dentro del tablero
+            if 0 <= fire['row'] < rows and 0 <= fire['col'] < cols:
+                self.fire[:, fire['row'] * cols + fire['col']] = True
+
+        # Tantos POIs activos como trae el mapa, igual que BoardModel.poi_target
+        self.num_slots = self.poi_target = len(scenario.markers)
+        self.num_agents = scenario.firefighters
+        self.poi_cell = np.full((num_boards, self.num_slots), -1)
+        self.poi_victim = np.zeros((num_boards, self.num_slots), dtype=bool)
+        for slot, marker in enumerate(scenario.markers):
+            self.poi_cell[:, slot] = marker['row'] * cols + marker['col']
+            self.poi_victim[:, slot] = marker['type'] == 'v'
+
+        shape = (num_boards, self.num_agents)
+        self.agent_cell = np.full(shape, -1)
+        self.placed = np.zeros(shape, dtype=bool)
+        self.carrying = np.zeros(shape, dtype=bool)
+        self.ap = np.full(shape, AP_PER_TURN)
+        self.target = np.full(shape, -1)  # Ranura del POI asignado
+
+        self.current = np.zeros(num_boards, dtype=int)
+        self.aux = np.zeros(num_boards, dtype=int)
+        self.dirty = np.ones(num_boards, dtype=bool)
+        self.turn_assigned = np.zeros(num_boards, dtype=bool)  # Igual que BoardModel: una asignación por turno
+        self.rescued = np.zeros(num_boards, dtype=int)
+        self.damage = np.zeros(num_boards, dtype=int)
+        self.steps = np.zeros(num_boards, dtype=int)
+        self.done = np.zeros(num_boards, dtype=bool)
+
+        # Campos de distancia por tablero: una ranura por POI y la última para las salidas
+        self.fields = np.full((num_boards, self.num_slots + 1, num_cells), INF, dtype=np.int32)
+        self.field_ok = np.zeros((num_boards, self.num_slots + 1), dtype=bool)
+        # Castigo por POI sin bombero, mayor que cualquier camino: primero se maximizan las parejas
+        self.unmatched_cost = WALL_COST * num_cells
+
+    # --- Paredes y puertas ---
+
+    def passable(self, boards, cells, d):
+        bits = self.walls[boards, cells]
+        return ((bits & WALL_BIT[d]) == 0) | ((bits & OPEN_BIT[d]) != 0)
+
+    def open_door(self, boards, cells, d):
+        self.walls[boards, cells] |= OPEN_BIT[d]
+        self.walls[boards, self.neighbors[cells, d]] |= OPEN_BIT[OPPOSITE[d]]
+        self.field_ok[boards] = False
+
+    def destroy_wall(self, boards, cells, d):
+        self.walls[boards, cells] &= ~WALL_BIT[d]
+        self.walls[boards, self.neighbors[cells, d]] &= ~WALL_BIT[OPPOSITE[d]]
+        self.field_ok[boards] = False
+
+    def hit_wall(self, boards, cells, d):
+        """Daño de explosión u onda expansiva a la pared (o puerta) entre `cells` y su vecino en `d`."""
+        keyed = self.has_wall_key[boards, cells, d]
+        wb, wc, wd = boards[keyed], cells[keyed], d[keyed]
+        self.wall_damage[wb, wc, wd] += 1
+        broken = self.wall_damage[wb, wc, wd] >= 2
+        self.destroy_wall(wb[broken], wc[broken], wd[broken])
+        np.add.at(self.damage, wb[broken], 2)
+
+        # Sin registro de daño solo puede ser una puerta cerrada
+        db, dc, dd = boards[~keyed], cells[~keyed], d[~keyed]
+        door = self.door_edges[dc, dd] & ~self.passable(db, dc, dd)
+        self.open_door(db[door], dc[door], dd[door])
+        np.add.at(self.damage, db[door], 1)
+
+    def exit_mask(self, boards):
+        walls = self.walls[boards]
+        no_wall = [(walls & bit) == 0 for bit in WALL_BIT]
+        return self.entrance_mask | (
+            ((self.cell_rows == 0) & no_wall[0])
+            | ((self.cell_cols == self.cols - 1) & no_wall[3])
+            | ((self.cell_rows == self.rows - 1) & no_wall[1])
+            | ((self.cell_cols == 0) & no_wall[2])
+        )
+
+    # --- Caminos ---
+
+    def step_costs(self, bits, cells):
+        """Costo en AP de salir de `cells` hacia cada dirección, con los bits de pared `bits`."""
+        bits = bits[..., None]
+        passable = ((bits & WALL_BIT) == 0) | ((bits & OPEN_BIT) != 0)
+        costs = np.where(passable, MOVE_COST, np.where(self.door_edges[cells], DOOR_COST, WALL_COST))
+        return np.where(self.neighbors[cells] < 0, INF, costs).astype(np.int32)
+
+    def distance_fields(self, costs, sources):
+        """Bellman-Ford por lotes: costo mínimo desde cada celda hasta alguna fuente.
+
+        Cada barrido relaja las cuatro direcciones sobre el mismo arreglo, y los
+        campos que ya no cambian salen del lote.
+        """
+        result = np.where(sources, 0, INF).astype(np.int32)
+        costs = [np.ascontiguousarray(costs[:, :, d]) for d in range(4)]
+        pending = np.arange(len(result))
+        dist = result.copy()
+        while len(pending):
+            before = dist.copy()
+            for d in range(4):
+                np.minimum(dist, costs[d] + dist[:, self.safe_neighbors[:, d]], out=dist)
+            changed = (dist != before).any(axis=1)
+            result[pending[~changed]] = dist[~changed]
+            if not changed.all():
+                pending, dist = pending[changed], dist[changed]
+                costs = [cost[changed] for cost in costs]
+        return result
+
+    def ensure_fields(self, boards):
+        slots = np.concatenate([self.poi_cell[boards] >= 0, np.ones((len(boards), 1), dtype=bool)], axis=1)
+        index_b, index_s = np.nonzero(slots & ~self.field_ok[boards])
+        if not len(index_b):
+            return
+        field_boards = boards[index_b]
+        sources = np.zeros((len(index_b), self.num_cells), dtype=bool)
+        is_exit = index_s == self.num_slots
+        sources[is_exit] = self.exit_mask(field_boards[is_exit])
+        poi = np.nonzero(~is_exit)[0]
+        sources[poi, self.poi_cell[field_boards[poi], index_s[poi]]] = True
+
+        self.fields[field_boards, index_s] = self.distance_fields(self.step_costs(self.walls[field_boards], slice(None)), sources)
+        self.field_ok[field_boards, index_s] = True
+
+    def next_direction(self, boards, cells, slots):
+        """Dirección del siguiente paso hacia el origen del campo (primer mínimo en N, S, W, E)."""
+        costs = self.step_costs(self.walls[boards, cells], cells)
+        ahead = self.fields[boards[:, None], slots[:, None], self.safe_neighbors[cells]]
+        return np.argmin(costs + ahead, axis=1)
+
+    # --- Partida ---
+
+    def tick(self):
+        """Avanza una acción en cada tablero en juego; regresa False cuando todos terminaron."""
+        self.done |= (self.rescued >= VICTORY_RESCUES) | (self.damage >= MAX_DAMAGE) | (self.steps >= self.max_steps)
+        boards = np.nonzero(~self.done)[0]
+        if not len(boards):
+            return False
+
+        current = self.current[boards]
+        entering = ~self.placed[boards, current]
+        eb, ea = boards[entering], current[entering]
+        self.agent_cell[eb, ea] = self.entrances[self.aux[eb]]
+        self.placed[eb, ea] = True
+        self.dirty[eb] = True
+
+        acting = self.ap[boards, current] > 0
+        self.act(boards[acting], current[acting])
+        self.end_turn(boards[~acting], current[~acting])
+        self.steps[boards] += 1
+        return True
+
+    def end_turn(self, boards, agents):
+        self.add_smoke(boards)
+        self.ap[boards, agents] = AP_PER_TURN
+        self.turn_assigned[boards] = False
+        self.current[boards] = (agents + 1) % self.num_agents
+        self.aux[boards] = (self.aux[boards] + 1) % len(self.entrances)
+        self.fill_pois(boards)
+
+    def act(self, boards, agents):
+        self.ensure_fields(boards)
+        pending = boards[self.dirty[boards] & ~self.turn_assigned[boards]]
+        self.solve_assignment(pending)
+        self.turn_assigned[pending] = True
+
+        cells = self.agent_cell[boards, agents]
+        carrying = self.carrying[boards, agents]
+
+        # Bomberos con víctima: salir o dar el siguiente paso del campo de salida
+        cb, ca, cc = boards[carrying], agents[carrying], cells[carrying]
+        at_exit = self.exit_mask(cb)[np.arange(len(cb)), cc]
+        self.carrying[cb[at_exit], ca[at_exit]] = False
+        np.add.at(self.rescued, cb[at_exit], 1)
+        self.dirty[cb[at_exit]] = True
+        mb, ma, mc = cb[~at_exit], ca[~at_exit], cc[~at_exit]
+        self.take_step(mb, ma, mc, self.next_direction(mb, mc, np.full(len(mb), self.num_slots)), move_cost=2)
+
+        # Bomberos libres: ir por su POI, o apagar, o moverse al azar
+        fb, fa, fc = boards[~carrying], agents[~carrying], cells[~carrying]
+        slots = self.target[fb, fa]
+        has_poi = slots >= 0
+        pb, pa, pc, ps = fb[has_poi], fa[has_poi], fc[has_poi], slots[has_poi]
+        arrived = self.poi_cell[pb, ps] == pc
+        self.interact(pb[arrived], pa[arrived], ps[arrived])
+        pb, pa, pc, ps = pb[~arrived], pa[~arrived], pc[~arrived], ps[~arrived]
+        self.take_step(pb, pa, pc, self.next_direction(pb, pc, ps), move_cost=1)
+
+        self.extinguish_or_move(fb[~has_poi], fa[~has_poi], fc[~has_poi])
+
+    def solve_assignment(self, boards):
+        """Misma asignación que BoardModel.solve_POI_assignment: máximo de parejas al menor costo de camino."""
+        if not len(boards):
+            return
+        self.dirty[boards] = False
+        free = self.placed[boards] & ~self.carrying[boards]
+        self.target[boards] = np.where(free, -1, self.target[boards])
+
+        active = self.poi_cell[boards] >= 0
+        cells = np.where(self.agent_cell[boards] < 0, 0, self.agent_cell[boards])
+        costs = self.fields[boards[:, None, None], np.arange(self.num_slots)[None, :, None], cells[:, None, :]].astype(np.int64)
+        costs = np.where(free[:, None, :] & active[:, :, None], costs, INF)
+        # Una columna de "sin bombero" por ranura; las ranuras vacías la toman gratis
+        unmatched = np.where(active, self.unmatched_cost, 0)[:, :, None]
+        costs = np.concatenate([costs, np.repeat(unmatched, self.num_slots, axis=2)], axis=2)
+
+        best = solve_assignments(costs)
+        for slot in range(self.num_slots):
+            chosen = best[:, slot] < self.num_agents
+            self.target[boards[chosen], best[chosen, slot]] = slot
+
+    def interact(self, boards, agents, slots):
+        self.carrying[boards, agents] = self.poi_victim[boards, slots]
+        self.poi_cell[boards, slots] = -1
+        self.field_ok[boards, slots] = False
+        self.target[boards, agents] = -1
+        self.dirty[boards] = True
+
+    def take_step(self, boards, agents, cells, d, move_cost):
+        """Igual que FireFighterAgent.take_step: moverse, abrir la puerta o golpear la pared."""
+        moving = self.passable(boards, cells, d)
+        self.agent_cell[boards[moving], agents[moving]] = self.neighbors[cells[moving], d[moving]]
+        self.ap[boards[moving], agents[moving]] -= move_cost
+
+        blocked = ~moving
+        boards, agents, cells, d = boards[blocked], agents[blocked], cells[blocked], d[blocked]
+        door = self.door_edges[cells, d]
+        self.open_door(boards[door], cells[door], d[door])
+        self.ap[boards[door], agents[door]] -= 1
+
+        boards, agents, cells, d = boards[~door], agents[~door], cells[~door], d[~door]
+        can_chop = self.ap[boards, agents] >= 2
+        self.ap[boards[~can_chop], agents[~can_chop]] = 0
+        boards, agents, cells, d = boards[can_chop], agents[can_chop], cells[can_chop], d[can_chop]
+        self.has_wall_key[boards, cells, d] = True
+        self.wall_damage[boards, cells, d] += 1
+        self.ap[boards, agents] -= 2
+        broken = self.wall_damage[boards, cells, d] >= 2
+        self.destroy_wall(boards[broken], cells[broken], d[broken])
+        np.add.at(self.damage, boards[broken], 2)
+
+    def extinguish_or_move(self, boards, agents, cells):
+        around = self.extinguish_cells[cells]
+        ap = self.ap[boards, agents]
+        rows = np.arange(len(boards))
+        handled = np.zeros(len(boards), dtype=bool)
+
+        for layer, min_ap, cost, to_smoke in ((self.fire, 2, 2, False), (self.fire, 1, 1, True), (self.smoke, 1, 1, False)):
+            found = layer[boards[:, None], around] & ~handled[:, None] & (ap >= min_ap)[:, None]
+            hit = found.any(axis=1)
+            target = around[rows, np.argmax(found, axis=1)][hit]
+            layer[boards[hit], target] = False
+            if to_smoke:
+                self.smoke[boards[hit], target] = True
+            self.ap[boards[hit], agents[hit]] -= cost
+            handled |= hit
+
+        self.move_randomly(boards[~handled], agents[~handled], cells[~handled])
+
+    def move_randomly(self, boards, agents, cells):
+        order = np.argsort(self.rng.random((len(boards), 4)), axis=1)
+        rows = np.arange(len(boards))[:, None]
+        inside = self.neighbors[cells[:, None], order] >= 0
+        passable = self.passable(boards[:, None], cells[:, None], order)
+        door = self.door_edges[cells[:, None], order] & ~passable
+        valid = inside & (passable | door)
+
+        moves = valid.any(axis=1)
+        choice = np.argmax(valid, axis=1)
+        boards, agents, cells = boards[moves], agents[moves], cells[moves]
+        d = order[rows[moves, 0], choice[moves]]
+        opening = door[rows[moves, 0], choice[moves]]
+        self.open_door(boards[opening], cells[opening], d[opening])
+        self.agent_cell[boards, agents] = self.neighbors[cells, d]
+        self.ap[boards, agents] -= 1
+
+    def add_smoke(self, boards):
+        n = len(boards)
+        cells = self.rng.integers(0, self.rows, n) * self.cols + self.rng.integers(0, self.cols, n)
+
+        on_fire = self.fire[boards, cells]
+        self.explode(boards[on_fire], cells[on_fire])
+        boards, cells = boards[~on_fire], cells[~on_fire]
+
+        on_smoke = self.smoke[boards, cells]
+        self.smoke[boards[on_smoke], cells[on_smoke]] = False
+        self.fire[boards[on_smoke], cells[on_smoke]] = True
+        boards, cells = boards[~on_smoke], cells[~on_smoke]
+
+        catches = np.zeros(len(boards), dtype=bool)
+        for d in range(4):
+            adjacent = self.adjacent[cells, d]
+            fire = self.fire[boards, self.safe_neighbors[cells, d]]
+            catches |= adjacent & fire & self.passable(boards, cells, np.full(len(cells), d))
+        self.fire[boards[catches], cells[catches]] = True
+        self.smoke[boards[~catches], cells[~catches]] = True
+
+    def explode(self, boards, cells):
+        for d in range(4):
+            nd = np.full(len(boards), d)
+            inside = self.neighbors[cells, d] >= 0
+            b, c, dd = boards[inside], cells[inside], nd[inside]
+            blocked = ~self.passable(b, c, dd)
+            self.hit_wall(b[blocked], c[blocked], dd[blocked])
+
+            b, c = b[~blocked], c[~blocked]
+            target = self.neighbors[c, d]
+            smoke = self.smoke[b, target]
+            self.smoke[b[smoke], target[smoke]] = False
+            self.fire[b[smoke], target[smoke]] = True
+            fire = ~smoke & self.fire[b, target]
+            self.fire[b[~smoke & ~fire], target[~smoke & ~fire]] = True
+            self.shockwave(b[fire], target[fire], d)
+        self.flashover(boards)
+
+    def shockwave(self, boards, cells, d):
+        """Propaga la onda en línea recta, como BoardModel.propagate_shockwave."""
+        while len(boards):
+            target = self.neighbors[cells, d]
+            inside = target >= 0
+            boards, cells, target = boards[inside], cells[inside], target[inside]
+            nd = np.full(len(boards), d)
+            blocked = ~self.passable(boards, cells, nd)
+            self.hit_wall(boards[blocked], cells[blocked], nd[blocked])
+
+            boards, target = boards[~blocked], target[~blocked]
+            fire = self.fire[boards, target]
+            smoke = ~fire & self.smoke[boards, target]
+            self.smoke[boards[smoke], target[smoke]] = False
+            self.fire[boards[~fire], target[~fire]] = True
+            keep_going = fire | smoke
+            boards, cells = boards[keep_going], target[keep_going]
+
+    def flashover(self, boards):
+        """El humo conectado a fuego por pasos abiertos se vuelve fuego hasta que no cambia nada."""
+        while len(boards):
+            fire, smoke = self.fire[boards], self.smoke[boards]
+            reached = np.zeros_like(smoke)
+            for d in range(4):
+                sources = self.adjacent[:, d]
+                spreading = fire[:, sources] & self.passable(boards[:, None], np.nonzero(sources)[0][None, :], d)
+                reached[:, self.neighbors[sources, d]] |= spreading
+            ignite = smoke & reached
+            changed = ignite.any(axis=1)
+            if not changed.any():
+                return
+            self.smoke[boards] = smoke & ~ignite
+            self.fire[boards] = fire | ignite
+            boards = boards[changed]
+
+    def fill_pois(self, boards):
+        count = (self.poi_cell[boards] >= 0).sum(axis=1) + self.carrying[boards].sum(axis=1)
+        pending = count < self.poi_target
+        boards, count = boards[pending], count[pending]
+
+        while len(boards):
+            free = np.ones((len(boards), self.num_cells), dtype=bool)
+            active = self.poi_cell[boards]
+            rows, slots = np.nonzero(active >= 0)
+            free[rows, active[rows, slots]] = False
+            # Sin celdas libres no hay dónde poner POIs
+            has_free = free.any(axis=1)
+            boards, count, free = boards[has_free], count[has_free], free[has_free]
+
+            cells = np.argmax(np.where(free, self.rng.random(free.shape), -1), axis=1)
+            self.fire[boards, cells] = False
+            self.smoke[boards, cells] = False
+            victim = self.rng.random(len(boards)) < VICTIM_PROBABILITY
+
+            occupied = ((self.agent_cell[boards] == cells[:, None]) & self.placed[boards]).any(axis=1)
+            # Una falsa alarma bajo un bombero no se pone; una víctima cuenta pero tampoco se pone
+            count += ~occupied | victim
+            place = ~occupied
+            pb, pc = boards[place], cells[place]
+            slot = np.argmax(self.poi_cell[pb] < 0, axis=1)
+            self.poi_cell[pb, slot] = pc
+            self.poi_victim[pb, slot] = victim[place]
+            self.field_ok[pb, slot] = False
+            self.dirty[pb] = True
+
+            pending = count < self.poi_target
+            boards, count = boards[pending], count[pending]
+
+    def run(self):
+        while self.tick():
+            pass
+        return pd.DataFrame({
+            "victory": self.rescued >= VICTORY_RESCUES,
+            "rescued_victims": self.rescued,
+            "total_damage": self.damage,
+            "steps": self.steps,
+        }, columns=RESULT_COLUMNS)
+
+
+def run_vectorized(map_path, num_games, max_steps=600, seed=0, batch_size=8192):
+    """Juega `num_games` partidas en lotes de `batch_size` tableros y regresa un DataFrame."""
+    scenario = parse_file(map_path, as_scenario=True)
+    rng = np.random.default_rng(seed)
+    results = []
+    for start in range(0, num_games, batch_size):
+        batch = BoardBatch(scenario, min(batch_size, num_games - start), rng, max_steps)
+        results.append(batch.run())
+    return pd.concat(results, ignore_index=True)
+
+
+def ks_test(sample1, sample2):
+    """Estadístico de Kolmogorov-Smirnov de dos muestras y su valor p asintótico."""
+    sample1, sample2 = np.sort(sample1), np.sort(sample2)
+    values = np.concatenate([sample1, sample2])
+    cdf1 = np.searchsorted(sample1, values, side='right') / len(sample1)
+    cdf2 = np.searchsorted(sample2, values, side='right') / len(sample2)
+    statistic = np.abs(cdf1 - cdf2).max()
+
+    n = len(sample1) * len(sample2) / (len(sample1) + len(sample2))
+    lam = (math.sqrt(n) + 0.12 + 0.11 / math.sqrt(n)) * statistic
+    p_value = 2 * sum((-1) ** (k - 1) * math.exp(-2 * k * k * lam * lam) for k in range(1, 101))
+    return statistic, min(max(p_value, 0.0), 1.0)
+
+
+def proportion_test(successes1, n1, successes2, n2):
+    pooled = (successes1 + successes2) / (n1 + n2)
+    spread = math.sqrt(pooled * (1 - pooled) * (1 / n1 + 1 / n2))
+    if spread == 0:
+        return 0.0, 1.0
+    z = (successes1 / n1 - successes2 / n2) / spread
+    return z, math.erfc(abs(z) / math.sqrt(2))
+
+
+def compare_outcomes(reference, candidate, alpha=0.01):
+    """Compara las distribuciones de resultados de dos DataFrames; regresa (filas, pasa)."""
+    rows = []
+    z, p_value = proportion_test(reference["victory"].sum(), len(reference), candidate["victory"].sum(), len(candidate))
+    rows.append({"metrica": "victory", "referencia": reference["victory"].mean(), "vectorizado": candidate["victory"].mean(),
+                 "estadistico": z, "p": p_value})
+    for column in ("rescued_victims", "total_damage", "steps"):
+        statistic, p_value = ks_test(reference[column].to_numpy(), candidate[column].to_numpy())
+        rows.append({"metrica": column, "referencia": reference[column].mean(), "vectorizado": candidate[column].mean(),
+                     "estadistico": statistic, "p": p_value})
+    table = pd.DataFrame(rows)
+    return table, bool((table["p"] > alpha).all())
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Corre partidas de Flash Point en lotes vectorizados.")
+    parser.add_argument("--map", default="final.txt")
+    parser.add_argument("--games", type=int, default=100000)
+    parser.add_argument("--max-steps", type=int, default=600)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--batch-size", type=int, default=8192)
+    parser.add_argument("--check", type=int, default=None, metavar="N",
+                        help="compara N partidas contra BoardModel en lugar de solo correr")
+    parser.add_argument("--output", default=None, help="CSV donde guardar los resultados")
+    args = parser.parse_args()
+
+    if args.check:
+        from simulacion_lote import run_batch
+
+        reference = run_batch(args.map, args.check, args.max_steps, base_seed=args.seed)
+        candidate = run_vectorized(args.map, args.check, args.max_steps, args.seed, args.batch_size)
+        table, passed = compare_outcomes(reference, candidate)
+        print(table.to_string(index=False))
+        print("Distribuciones equivalentes" if passed else "Las distribuciones difieren")
+        raise SystemExit(0 if passed else 1)
+
+    start = time.perf_counter()
+    results = run_vectorized(args.map, args.games, args.max_steps, args.seed, args.batch_size)
+    elapsed = time.perf_counter() - start
+    print(results.describe())
+    print(f"{args.games} partidas en {elapsed:.1f} s ({args.games / elapsed:.0f} partidas/s)")
+    if args.output:
+        results.to_csv(args.output, index=False)
@@ -1,14 +1,39 @@
-from flask import Flask, jsonify
+from flask import Flask, Response, g, jsonify, request, stream_with_context
 from flask_cors import CORS
+from collections import OrderedDict, namedtuple
+import functools
+import gzip
+import hashlib
+import json
+import multiprocessing
+import os
+import queue
+import random
 import re
+import threading
+import time
+import uuid
+import zlib
+
+import formato_compacto
+# El núcleo (solo mesa y numpy) se carga al arrancar para que la primera
+# petición no pague la importación; matplotlib nunca se carga en el servidor
+from motor import (BoardModel, get_exit_distances, get_fires_state, get_grid, get_smokes_state, parse_file,
+                   read_map_header)
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
 
 app = Flask(__name__)
 CORS(app)
 
 def parse_map_file(filename):
     with open(filename, 'r') as file:
-        lines = file.readlines()[:]
-    
+        lines = file.read().splitlines()
+    counts, current_line = read_map_header(lines)
+
     map_data = {
         "cells": [],
         "pointsOfInterest": [],
@@ -16,56 +41,115 @@ def parse_map_file(filename):
         "doors": [],
         "entryPoints": []
     }
-    
-    current_line = 0
-    
-    for i in range(6):
+
+    def section(name):
+        # Mismas líneas por sección que parse_file; las vacías se saltan
+        nonlocal current_line
+        rows = lines[current_line:current_line + counts[name]]
+        current_line += counts[name]
+        return [line.strip().split() for line in rows if line.strip()]
+
+    for i in range(counts['rows']):
         cell_row = re.findall(r'\d{4}', lines[current_line].strip())
         map_data["cells"].append(cell_row)
         current_line += 1
-    
-    for _ in range(3):
-        row, col, poi_type = lines[current_line].strip().split()
+
+    for row, col, poi_type in section('pois'):
         map_data["pointsOfInterest"].append({
             "row": int(row),
             "col": int(col),
             "type": poi_type
         })
-        current_line += 1
-    
-    for _ in range(10):
-        row, col = map(int, lines[current_line].strip().split())
+
+    for row, col in section('fires'):
         map_data["firePositions"].append({
-            "x": row,
-            "y": col
+            "x": int(row),
+            "y": int(col)
         })
-        current_line += 1
-    
-    for _ in range(8):
-        r1, c1, r2, c2 = map(int, lines[current_line].strip().split())
+
+    for r1, c1, r2, c2 in section('doors'):
         map_data["doors"].append({
-            "r1": r1,
-            "c1": c1,
-            "r2": r2,
-            "c2": c2
+            "r1": int(r1),
+            "c1": int(c1),
+            "r2": int(r2),
+            "c2": int(c2)
         })
-        current_line += 1
-    
-    for _ in range(4):
-        row, col = map(int, lines[current_line].strip().split())
+
+    for row, col in section('entrances'):
         map_data["entryPoints"].append({
-            "x": row,
-            "y": col
+            "x": int(row),
+            "y": int(col)
         })
-        current_line += 1
-    
+
     return map_data
 
+MAP_FILE = 'final.txt'
+MAP_CACHE_SIZE = 8
+
+# Escenarios que se pueden pedir con ?scenario=<id>
+SCENARIOS = {
+    "final": MAP_FILE,
+}
+DEFAULT_SCENARIO = "final"
+
+CachedMap = namedtuple('CachedMap', ['path', 'version', 'map_json', 'etag', 'scenario'])
+
+class MapCache:
+    """Mapas ya leídos, compartidos por todas las peticiones del proceso.
+
+    Cada entrada se indexa por ruta y se vuelve a leer si cambia el mtime o el
+    tamaño del archivo. Guarda el JSON de /api/map ya serializado (con su ETag)
+    y el Scenario de parse_file para crear partidas. Cuando hay más de
+    `max_entries` mapas se descarta el usado hace más tiempo.
+    """
+    def __init__(self, max_entries=MAP_CACHE_SIZE):
+        self.max_entries = max_entries
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+
+    def get(self, path):
+        key = os.path.abspath(path)
+        stat = os.stat(key)
+        version = (stat.st_mtime_ns, stat.st_size)
+
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is not None and entry.version == version:
+                self.entries.move_to_end(key)
+                return entry
+
+        entry = self.load(key, version)
+        with self.lock:
+            self.entries[key] = entry
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+        return entry
+
+    def load(self, path, version):
+        map_json = app.json.dumps(parse_map_file(path)).encode('utf-8')
+        return CachedMap(
+            path=path,
+            version=version,
+            map_json=map_json,
+            etag=hashlib.sha1(map_json).hexdigest(),
+            scenario=parse_file(path, as_scenario=True),
+        )
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+
+map_cache = MapCache()
+
 @app.route('/api/map')
 def get_map():
     try:
-        map_data = parse_map_file('final.txt')
-        return jsonify(map_data)
+        cached = map_cache.get(MAP_FILE)
+        response = Response(cached.map_json, mimetype='application/json')
+        response.set_etag(cached.etag)
+        # Responde 304 si el cliente ya tiene esta versión (If-None-Match)
+        return response.make_conditional(request)
     except Exception as e:
         import traceback
         error_info = {
@@ -74,29 +158,275 @@ def get_map():
         }
         return jsonify(error_info), 500
     
+# Capas opcionales que se agregan a cada cuadro con ?overlay=<nombre>[,<nombre>]
+SIMULATION_OVERLAYS = ("exit",)
+
+def build_frame(model, overlays=()):
+    frame = {
+        "grid": get_grid(model).tolist(),
+        "fires": get_fires_state(model),
+        "smokes": get_smokes_state(model),
+        "agents": [{"id": agent.unique_id, "pos": agent.pos} for agent in model.schedule.agents],
+        "rescued_victims": model.rescued_victims,
+        "total_damage": model.total_damage
+    }
+    if "exit" in overlays:
+        frame["exit_distance"] = get_exit_distances(model)
+    return frame
+
+def simulation_frames(model, overlays=()):
+    """Avanza el modelo y genera un cuadro por paso mientras la partida corre."""
+    while not model.check_termination_conditions():
+        model.step()
+        yield build_frame(model, overlays)
+
+def new_simulation_model(scenario, seed):
+    # Los cuadros se arman del modelo en vivo; no hace falta el historial por paso
+    return BoardModel.from_scenario(scenario, collection_level="none", seed=seed, metrics=GAME_METRICS)
+
+SIMULATION_CACHE_SIZE = 32
+SIMULATION_CACHE_DIR = os.environ.get('SIMULATION_CACHE_DIR')
+
+class SimulationCache:
+    """Partidas terminadas, serializadas en JSON (o en el formato compacto), por escenario y semilla.
+
+    Las más recientes viven en memoria (LRU de `max_entries`); si se da
+    `directory` también se guardan en disco y sobreviven a reinicios. Si varias
+    peticiones piden la misma partida a la vez, solo una la calcula y las demás
+    esperan su resultado.
+    """
+    def __init__(self, max_entries=SIMULATION_CACHE_SIZE, directory=None):
+        self.max_entries = max_entries
+        self.directory = directory
+        self.entries = OrderedDict()
+        self.pending = {}
+        self.lock = threading.Lock()
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+    def path(self, key):
+        # Los binarios del formato compacto se guardan con su propia extensión
+        extension = "fpf" if "-compact" in key else "json"
+        return os.path.join(self.directory, f"{key}.{extension}")
+
+    def get(self, key):
+        with self.lock:
+            payload = self.entries.get(key)
+            if payload is not None:
+                self.entries.move_to_end(key)
+                return payload
+
+        if self.directory and os.path.exists(self.path(key)):
+            with open(self.path(key), 'rb') as file:
+                payload = file.read()
+            self.remember(key, payload)
+            return payload
+        return None
+
+    def remember(self, key, payload):
+        with self.lock:
+            self.entries[key] = payload
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+
+    def put(self, key, payload):
+        self.remember(key, payload)
+        if self.directory:
+            # Escribir a un archivo temporal y renombrar para no dejar archivos a medias
+            tmp_path = f"{self.path(key)}.{threading.get_ident()}.tmp"
+            with open(tmp_path, 'wb') as file:
+                file.write(payload)
+            os.replace(tmp_path, self.path(key))
+
+    def get_or_compute(self, key, compute):
+        """Regresa (payload, hit); `compute()` corre una sola vez por llave a la vez."""
+        payload = self.get(key)
+        if payload is not None:
+            return payload, True
+
+        with self.lock:
+            event = self.pending.get(key)
+            owner = event is None
+            if owner:
+                event = self.pending[key] = threading.Event()
+
+        if not owner:
+            event.wait()
+            payload = self.get(key)
+            if payload is not None:
+                return payload, True
+            # El otro cálculo falló; intentar aquí
+            return self.compute_and_store(key, compute), False
+
+        try:
+            return self.compute_and_store(key, compute), False
+        finally:
+            with self.lock:
+                del self.pending[key]
+            event.set()
+
+    def compute_and_store(self, key, compute):
+        payload = compute()
+        self.put(key, payload)
+        return payload
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+
+simulation_cache = SimulationCache(directory=SIMULATION_CACHE_DIR)
+
+def simulation_request():
+    """Lee scenario y seed; regresa (cached_map, seed, error) donde error es una respuesta o None.
+
+    Los parámetros vienen en la query string o, en un POST, también en el cuerpo JSON.
+    """
+    params = dict(request.get_json(silent=True) or {}) if request.method == 'POST' else {}
+    params.update(request.args.to_dict())
+
+    scenario_id = params.get('scenario', DEFAULT_SCENARIO)
+    if scenario_id not in SCENARIOS:
+        return None, None, (jsonify({"error": f"Escenario desconocido: {scenario_id}"}), 404)
+
+    seed = params.get('seed')
+    if seed is None:
+        # Sin semilla se juega una partida nueva, pero se reporta su semilla para repetirla
+        seed = random.randrange(2**32)
+    else:
+        try:
+            seed = int(seed)
+        except (TypeError, ValueError):
+            seed = -1
+        if not 0 <= seed < 2**32:
+            return None, None, (jsonify({"error": "seed debe ser un entero entre 0 y 2**32 - 1"}), 400)
+
+    return map_cache.get(SCENARIOS[scenario_id]), seed, None
+
+def requested_overlays():
+    """Regresa (overlays, error) a partir de ?overlay=; error es una respuesta o None."""
+    overlays = tuple(sorted({name for name in request.args.get('overlay', '').split(',') if name}))
+    unknown = [name for name in overlays if name not in SIMULATION_OVERLAYS]
+    if unknown:
+        return (), (jsonify({"error": f"Capa desconocida: {', '.join(unknown)}"}), 400)
+    return overlays, None
+
+def simulation_key(cached_map, seed, overlays=()):
+    # El ETag del mapa es el hash de su contenido: si el archivo cambia, cambia la llave
+    return "-".join((cached_map.etag, str(seed)) + overlays)
+
+def wants_compact():
+    """True si el cliente pidió el formato binario (?encoding=compact o por Accept)."""
+    if request.args.get('encoding') == 'compact':
+        return True
+    return request.accept_mimetypes.best_match(['application/json', formato_compacto.CONTENT_TYPE]) == formato_compacto.CONTENT_TYPE
+
+def compact_response(cached_map, key, payload):
+    """Respuesta binaria de una partida; el binario se guarda en el caché junto al JSON.
+
+    `payload` es el JSON de la partida; solo se decodifica la primera vez que se
+    pide en binario (?compress=zlib lo comprime y se guarda aparte).
+    """
+    compress = request.args.get('compress') == 'zlib'
+    scenario = cached_map.scenario
+
+    def encode():
+        return formato_compacto.encode_frames(json.loads(payload), scenario.wall_bits, scenario.doors,
+                                              scenario.entrances, compress=compress)
+
+    compact_key = f"{key}-compact" + ("-zlib" if compress else "")
+    data, _ = simulation_cache.get_or_compute(compact_key, encode)
+    return Response(data, mimetype=formato_compacto.CONTENT_TYPE)
+
+# Nivel de compresión: 1-9 para gzip, 0-11 para brotli
+COMPRESSION_LEVEL = int(os.environ.get('SIMULATION_COMPRESSION_LEVEL', 6))
+COMPRESSION_MIN_SIZE = int(os.environ.get('SIMULATION_COMPRESSION_MIN_SIZE', 1024))
+
+def response_encoding():
+    """'br' o 'gzip' según Accept-Encoding; brotli solo si el paquete está instalado."""
+    offered = ['br', 'gzip'] if brotli is not None else ['gzip']
+    return request.accept_encodings.best_match(offered)
+
+def compress_bytes(data, encoding):
+    if encoding == 'br':
+        return brotli.compress(data, quality=COMPRESSION_LEVEL)
+    return gzip.compress(data, compresslevel=COMPRESSION_LEVEL, mtime=0)
+
+def compress_stream(chunks, encoding):
+    """Comprime un flujo pedazo por pedazo, vaciando el compresor en cada uno para no retrasar cuadros."""
+    if encoding == 'br':
+        compressor = brotli.Compressor(quality=COMPRESSION_LEVEL)
+        process, flush, finish = compressor.process, compressor.flush, compressor.finish
+    else:
+        compressor = zlib.compressobj(COMPRESSION_LEVEL, zlib.DEFLATED, 31)
+        process, flush, finish = compressor.compress, lambda: compressor.flush(zlib.Z_SYNC_FLUSH), compressor.flush
+
+    for chunk in chunks:
+        if isinstance(chunk, str):
+            chunk = chunk.encode('utf-8')
+        yield process(chunk) + flush()
+    yield finish()
+
+def compressible(view):
+    """Comprime la respuesta de la vista con gzip o brotli si el cliente lo acepta.
+
+    Las respuestas completas solo se comprimen desde COMPRESSION_MIN_SIZE bytes;
+    los flujos se comprimen siempre porque no se conoce su tamaño.
+    """
+    @functools.wraps(view)
+    def wrapper(*args, **kwargs):
+        response = app.make_response(view(*args, **kwargs))
+        response.vary.add('Accept-Encoding')
+        encoding = response_encoding()
+        if encoding is None or response.status_code != 200 or 'Content-Encoding' in response.headers:
+            return response
+
+        if response.is_streamed:
+            response.response = compress_stream(response.response, encoding)
+            response.headers.pop('Content-Length', None)
+        else:
+            data = response.get_data()
+            if len(data) < COMPRESSION_MIN_SIZE:
+                return response
+            response.set_data(compress_bytes(data, encoding))
+        response.headers['Content-Encoding'] = encoding
+        return response
+    return wrapper
+
 @app.route('/api/simulation', methods=['GET'])
+@compressible
 def run_simulation():
-    from AgentesModelo import BoardModel, parse_file
-    
+    """Corre una partida y regresa todos sus cuadros.
+
+    Con ?seed=<n> la partida es reproducible y se sirve desde el caché si ya se
+    jugó; la semilla usada va siempre en el encabezado X-Simulation-Seed. Con
+    ?encoding=compact los cuadros van en el formato binario de formato_compacto.
+    ?overlay=exit agrega a cada cuadro el costo hasta la salida de cada celda.
+    """
     try:
-        walls, markers, fire_markers, doors, entrances = parse_file('final.txt')
-        model = BoardModel(6, 8, walls, doors, entrances, markers, fire_markers)
-        
-        simulation_results = []
-        
-        while not model.check_termination_conditions():
-            model.step()
-            grid_state = model.datacollector.get_model_vars_dataframe().iloc[-1].to_dict()
-            simulation_results.append({
-                "grid": grid_state["Grid"].tolist(),
-                "fires": grid_state["Fires"],
-                "smokes": grid_state["Smokes"],
-                "agents": [{"id": agent.unique_id, "pos": agent.pos} for agent in model.schedule.agents],
-                "rescued_victims": model.rescued_victims,
-                "total_damage": model.total_damage
-            })
-        
-        return jsonify(simulation_results)
+        cached_map, seed, error = simulation_request()
+        if error:
+            return error
+        overlays, error = requested_overlays()
+        if error:
+            return error
+
+        def compute():
+            model = new_simulation_model(cached_map.scenario, seed)
+            frames = list(simulation_frames(model, overlays))
+            metrics.record_game(model.get_metrics())
+            return app.json.dumps(frames).encode('utf-8')
+
+        key = simulation_key(cached_map, seed, overlays)
+        payload, hit = simulation_cache.get_or_compute(key, compute)
+        if wants_compact():
+            response = compact_response(cached_map, key, payload)
+        else:
+            response = Response(payload, mimetype='application/json')
+        response.vary.add('Accept')
+        response.headers['X-Simulation-Seed'] = str(seed)
+        response.headers['X-Cache'] = 'hit' if hit else 'miss'
+        return response
     except Exception as e:
         import traceback
         return jsonify({
@@ -104,6 +434,413 @@ def run_simulation():
             "traceback": traceback.format_exc()
         }), 500
 
+JOB_WORKERS = int(os.environ.get('SIMULATION_JOB_WORKERS', 2))
+JOB_QUEUE_SIZE = int(os.environ.get('SIMULATION_JOB_QUEUE', 32))
+JOB_HISTORY = 200
+JOB_FRAME_BATCH = 16
+
+def job_worker(conn):
+    """Proceso del pool: recibe (Scenario, semilla) y manda los cuadros en lotes.
+
+    El Scenario llega ya leído del MapCache del proceso principal. Al terminar
+    manda las métricas de la partida para que el proceso principal las sume.
+    """
+    while True:
+        task = conn.recv()
+        if task is None:
+            break
+        scenario, seed = task
+        try:
+            model = new_simulation_model(scenario, seed)
+            batch = []
+            for frame in simulation_frames(model):
+                batch.append(frame)
+                if len(batch) >= JOB_FRAME_BATCH:
+                    conn.send(('frames', batch))
+                    batch = []
+            conn.send(('frames', batch))
+            conn.send(('done', model.get_metrics()))
+        except Exception:
+            import traceback
+            conn.send(('error', traceback.format_exc()))
+
+class SimulationJob:
+    def __init__(self, cached_map, seed):
+        self.id = uuid.uuid4().hex
+        self.scenario = cached_map.scenario
+        self.key = simulation_key(cached_map, seed)
+        self.seed = seed
+        self.status = 'queued'
+        self.frames = []
+        self.error = None
+        self.created = time.time()
+        self.finished = None
+        self.cancel_requested = threading.Event()
+
+    def to_dict(self):
+        return {
+            "id": self.id,
+            "status": self.status,
+            "seed": self.seed,
+            "frames_available": len(self.frames),
+            "error": self.error,
+        }
+
+class SimulationJobManager:
+    """Trabajos de simulación en segundo plano sobre un pool acotado de procesos.
+
+    Hay `workers` hilos despachadores, cada uno dueño de un proceso que corre
+    las partidas y le manda sus cuadros conforme salen, así que los clientes
+    pueden leer cuadros parciales. La cola admite a lo más `queue_size`
+    trabajos en espera. Cancelar un trabajo en espera lo saca de turno;
+    cancelar uno en curso termina su proceso y el despachador levanta otro.
+    Los trabajos terminados también se guardan en `cache`.
+    """
+    def __init__(self, workers=JOB_WORKERS, queue_size=JOB_QUEUE_SIZE, history=JOB_HISTORY, cache=None):
+        self.workers = workers
+        self.history = history
+        self.cache = cache
+        self.queue = queue.Queue(maxsize=queue_size)
+        self.jobs = OrderedDict()
+        self.lock = threading.Lock()
+        self.threads = []
+
+    def submit(self, cached_map, seed):
+        """Crea un trabajo; regresa None si la cola está llena."""
+        job = SimulationJob(cached_map, seed)
+        payload = self.cache.get(job.key) if self.cache is not None else None
+        if payload is not None:
+            job.frames = json.loads(payload)
+            self.finish(job, 'done')
+        else:
+            try:
+                self.queue.put_nowait(job)
+            except queue.Full:
+                return None
+            self.start()
+
+        with self.lock:
+            self.jobs[job.id] = job
+            self.forget_finished()
+        return job
+
+    def get(self, job_id):
+        with self.lock:
+            return self.jobs.get(job_id)
+
+    def cancel(self, job_id):
+        job = self.get(job_id)
+        if job is None or job.status not in ('queued', 'running'):
+            return job
+        job.cancel_requested.set()
+        if job.status == 'queued':
+            # El despachador lo descarta cuando le toque
+            self.finish(job, 'cancelled')
+        return job
+
+    def finish(self, job, status, error=None):
+        job.status = status
+        job.error = error
+        job.finished = time.time()
+
+    def forget_finished(self):
+        finished = [job_id for job_id, job in self.jobs.items() if job.finished is not None]
+        for job_id in finished[:max(len(finished) - self.history, 0)]:
+            del self.jobs[job_id]
+
+    def start(self):
+        with self.lock:
+            while len(self.threads) < self.workers:
+                thread = threading.Thread(target=self.dispatch, daemon=True)
+                thread.start()
+                self.threads.append(thread)
+
+    def new_process(self):
+        parent_conn, child_conn = multiprocessing.Pipe()
+        process = multiprocessing.Process(target=job_worker, args=(child_conn,), daemon=True)
+        process.start()
+        return process, parent_conn
+
+    def dispatch(self):
+        process, conn = None, None
+        while True:
+            job = self.queue.get()
+            if job.cancel_requested.is_set():
+                continue
+            if process is None or not process.is_alive():
+                process, conn = self.new_process()
+
+            job.status = 'running'
+            try:
+                conn.send((job.scenario, job.seed))
+                while True:
+                    if job.cancel_requested.is_set():
+                        process.terminate()
+                        process.join()
+                        process = None
+                        self.finish(job, 'cancelled')
+                        break
+                    if not conn.poll(0.05):
+                        continue
+                    kind, data = conn.recv()
+                    if kind == 'frames':
+                        job.frames.extend(data)
+                    elif kind == 'done':
+                        metrics.record_game(data)
+                        if self.cache is not None:
+                            self.cache.put(job.key, app.json.dumps(job.frames).encode('utf-8'))
+                        self.finish(job, 'done')
+                        break
+                    else:
+                        self.finish(job, 'failed', data)
+                        break
+            except (EOFError, OSError) as e:
+                # El proceso murió a media partida; se levanta otro para el siguiente trabajo
+                process = None
+                self.finish(job, 'failed', str(e) or 'El proceso de simulación terminó inesperadamente')
+            except Exception as e:
+                # Cualquier otro error (al serializar, al guardar en caché, ...) solo
+                # falla este trabajo; el proceso puede haber quedado a media
+                # respuesta, así que se reemplaza y el despachador sigue
+                if process is not None:
+                    process.terminate()
+                    process.join()
+                process = None
+                self.finish(job, 'failed', f"{type(e).__name__}: {e}")
+
+job_manager = SimulationJobManager(cache=simulation_cache)
+
+@app.route('/api/jobs', methods=['POST'])
+def create_job():
+    """Encola una partida (seed y scenario opcionales) y regresa 202 con el id del trabajo."""
+    cached_map, seed, error = simulation_request()
+    if error:
+        return error
+
+    job = job_manager.submit(cached_map, seed)
+    if job is None:
+        response = jsonify({"error": "La cola de simulaciones está llena"})
+        response.headers['Retry-After'] = '1'
+        return response, 429
+
+    response = jsonify(job.to_dict())
+    response.headers['Location'] = f"/api/jobs/{job.id}"
+    return response, 202
+
+@app.route('/api/jobs/<job_id>', methods=['GET'])
+def get_job(job_id):
+    job = job_manager.get(job_id)
+    if job is None:
+        return jsonify({"error": "Trabajo no encontrado"}), 404
+    return jsonify(job.to_dict())
+
+@app.route('/api/jobs/<job_id>/frames', methods=['GET'])
+@compressible
+def get_job_frames(job_id):
+    """Cuadros disponibles desde ?offset= (hasta ?limit=); sirve mientras el trabajo corre."""
+    job = job_manager.get(job_id)
+    if job is None:
+        return jsonify({"error": "Trabajo no encontrado"}), 404
+
+    offset = max(request.args.get('offset', 0, type=int), 0)
+    limit = request.args.get('limit', type=int)
+    # Leer el estado antes que los cuadros: si ya decía "done", no faltan cuadros
+    status = job.status
+    frames = job.frames[offset:offset + limit if limit is not None else None]
+    return jsonify({
+        "id": job.id,
+        "status": status,
+        "offset": offset,
+        "next_offset": offset + len(frames),
+        "frames": frames,
+    })
+
+@app.route('/api/jobs/<job_id>', methods=['DELETE'])
+def cancel_job(job_id):
+    """Cancela un trabajo en espera o en curso; los terminados responden 409."""
+    job = job_manager.get(job_id)
+    if job is None:
+        return jsonify({"error": "Trabajo no encontrado"}), 404
+    if job.status in ('done', 'failed'):
+        return jsonify(job.to_dict()), 409
+
+    job_manager.cancel(job_id)
+    return jsonify(job.to_dict())
+
+STREAM_FORMATS = {
+    "ndjson": "application/x-ndjson",
+    "sse": "text/event-stream",
+}
+
+def encode_stream_line(payload, stream_format, event=None):
+    data = json.dumps(payload, separators=(',', ':'))
+    if stream_format == "sse":
+        prefix = f"event: {event}\n" if event else ""
+        return f"{prefix}data: {data}\n\n"
+    return data + "\n"
+
+@app.route('/api/simulation/stream', methods=['GET'])
+@compressible
+def stream_simulation():
+    """Mismos cuadros que /api/simulation, enviados uno por paso mientras el modelo corre.
+
+    ?format=ndjson (por defecto) manda un JSON por línea; ?format=sse usa
+    Server-Sent Events y cierra con un evento "end". Acepta ?seed=,
+    ?scenario= y ?overlay= igual que /api/simulation.
+    """
+    stream_format = request.args.get('format', 'ndjson')
+    if stream_format not in STREAM_FORMATS:
+        return jsonify({"error": f"Formato no soportado: {stream_format}"}), 400
+    cached_map, seed, error = simulation_request()
+    if error:
+        return error
+    overlays, error = requested_overlays()
+    if error:
+        return error
+    key = simulation_key(cached_map, seed, overlays)
+
+    def generate():
+        try:
+            payload = simulation_cache.get(key)
+            if payload is not None:
+                frames = json.loads(payload)
+            else:
+                # Guardar los cuadros conforme salen para dejar la partida en caché al final
+                frames = []
+                model = new_simulation_model(cached_map.scenario, seed)
+                for frame in simulation_frames(model, overlays):
+                    frames.append(frame)
+                    yield encode_stream_line(frame, stream_format)
+                metrics.record_game(model.get_metrics())
+                simulation_cache.put(key, app.json.dumps(frames).encode('utf-8'))
+                frames = ()
+
+            for frame in frames:
+                yield encode_stream_line(frame, stream_format)
+            if stream_format == "sse":
+                yield encode_stream_line({"seed": seed}, stream_format, event="end")
+        except Exception as e:
+            # El estado HTTP ya se envió; el error viaja como último mensaje
+            import traceback
+            yield encode_stream_line({
+                "error": str(e),
+                "traceback": traceback.format_exc()
+            }, stream_format, event="error")
+
+    return Response(
+        stream_with_context(generate()),
+        mimetype=STREAM_FORMATS[stream_format],
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no", "X-Simulation-Seed": str(seed)},
+    )
+
+
+# Métricas de /api/metrics. Con SIMULATION_GAME_METRICS=0 las partidas corren sin instrumentar.
+GAME_METRICS = os.environ.get('SIMULATION_GAME_METRICS', '1') != '0'
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+class MetricsRegistry:
+    """Contadores del proceso en formato de texto de Prometheus.
+
+    Guarda un histograma de latencia por ruta y método, las peticiones por
+    código de estado y la suma de las métricas de cada partida jugada
+    (BoardModel.get_metrics): tiempos por fase y contadores de eventos.
+    """
+    def __init__(self, buckets=LATENCY_BUCKETS):
+        self.buckets = buckets
+        self.lock = threading.Lock()
+        self.latency = {}
+        self.requests = {}
+        self.games = 0
+        self.game_steps = 0
+        self.phase_seconds = {}
+        self.events = {}
+
+    def observe_request(self, endpoint, method, status, seconds):
+        with self.lock:
+            histogram = self.latency.setdefault((endpoint, method), [[0] * len(self.buckets), 0.0, 0])
+            for i, bound in enumerate(self.buckets):
+                if seconds <= bound:
+                    histogram[0][i] += 1
+            histogram[1] += seconds
+            histogram[2] += 1
+            key = (endpoint, method, str(status))
+            self.requests[key] = self.requests.get(key, 0) + 1
+
+    def record_game(self, summary):
+        if summary is None:
+            return
+        with self.lock:
+            self.games += 1
+            self.game_steps += summary["steps"]
+            for phase, seconds in summary["timers"].items():
+                self.phase_seconds[phase] = self.phase_seconds.get(phase, 0.0) + seconds
+            for event, count in summary["counters"].items():
+                self.events[event] = self.events.get(event, 0) + count
+
+    def render(self):
+        def labels(**values):
+            return '{' + ','.join(f'{key}="{value}"' for key, value in values.items()) + '}'
+
+        with self.lock:
+            lines = [
+                '# HELP flashpoint_http_requests_total Peticiones atendidas por ruta, método y estado.',
+                '# TYPE flashpoint_http_requests_total counter',
+            ]
+            for (endpoint, method, status), count in sorted(self.requests.items()):
+                lines.append(f'flashpoint_http_requests_total{labels(endpoint=endpoint, method=method, status=status)} {count}')
+
+            lines += [
+                '# HELP flashpoint_http_request_duration_seconds Latencia hasta tener la respuesta (sin el cuerpo de los flujos).',
+                '# TYPE flashpoint_http_request_duration_seconds histogram',
+            ]
+            for (endpoint, method), (counts, total, count) in sorted(self.latency.items()):
+                for bound, bucket in zip(self.buckets, counts):
+                    lines.append(f'flashpoint_http_request_duration_seconds_bucket'
+                                 f'{labels(endpoint=endpoint, method=method, le=bound)} {bucket}')
+                lines.append(f'flashpoint_http_request_duration_seconds_bucket'
+                             f'{labels(endpoint=endpoint, method=method, le="+Inf")} {count}')
+                lines.append(f'flashpoint_http_request_duration_seconds_sum{labels(endpoint=endpoint, method=method)} {total}')
+                lines.append(f'flashpoint_http_request_duration_seconds_count{labels(endpoint=endpoint, method=method)} {count}')
+
+            lines += [
+                '# HELP flashpoint_games_total Partidas jugadas con métricas.',
+                '# TYPE flashpoint_games_total counter',
+                f'flashpoint_games_total {self.games}',
+                '# HELP flashpoint_game_steps_total Pasos jugados en esas partidas.',
+                '# TYPE flashpoint_game_steps_total counter',
+                f'flashpoint_game_steps_total {self.game_steps}',
+                '# HELP flashpoint_game_phase_seconds_total Tiempo por fase del modelo; "advance" incluye a las demás.',
+                '# TYPE flashpoint_game_phase_seconds_total counter',
+            ]
+            for phase, seconds in sorted(self.phase_seconds.items()):
+                lines.append(f'flashpoint_game_phase_seconds_total{labels(phase=phase)} {seconds}')
+            lines += [
+                '# HELP flashpoint_game_events_total Eventos del modelo (explosiones, paredes rotas, ...).',
+                '# TYPE flashpoint_game_events_total counter',
+            ]
+            for event, count in sorted(self.events.items()):
+                lines.append(f'flashpoint_game_events_total{labels(event=event)} {count}')
+        return '\n'.join(lines) + '\n'
+
+metrics = MetricsRegistry()
+
+@app.before_request
+def start_request_timer():
+    g.request_start = time.perf_counter()
+
+@app.after_request
+def observe_request(response):
+    start = g.pop('request_start', None)
+    if start is not None:
+        endpoint = request.url_rule.rule if request.url_rule is not None else 'sin_ruta'
+        metrics.observe_request(endpoint, request.method, response.status_code, time.perf_counter() - start)
+    return response
+
+@app.route('/api/metrics')
+def get_metrics():
+    """Métricas del servidor y de las partidas en formato de texto de Prometheus."""
+    return Response(metrics.render(), content_type='text/plain; version=0.0.4; charset=utf-8')
+
 
 if __name__ == '__main__':
     app.run(debug=True, host='0.0.0.0', port=5000)
\ No newline at end of file
@@ -0,0 +1,233 @@
+"""Revisiones de regresión del motor sobre tableros y partidas con semilla.
+
+Cada revisión regresa una lista de problemas (vacía si todo está bien), igual
+que `check_scenario` de generador_mapas. Se corren sobre final.txt y sobre
+edificios generados cuadrados y no cuadrados, para atrapar cruces de filas y
+columnas que el tablero de 6x8 no muestra.
+
+Uso:
+    python verificar_motor.py
+"""
+import argparse
+import random
+
+import numpy as np
+import pandas as pd
+
+from generador_mapas import generate_map
+from motor import BoardModel, Scenario, can_move, parse_file
+from motor_vectorizado import BoardBatch, compare_outcomes
+
+MAP_FILE = 'final.txt'
+# (filas, columnas, semilla) de los edificios generados
+GENERATED_SIZES = ((10, 10, 0), (10, 20, 1), (20, 10, 1))
+
+
+def scenarios(map_path=MAP_FILE):
+    """Pares (nombre, Scenario) de final.txt y de los edificios generados."""
+    yield map_path, parse_file(map_path, as_scenario=True)
+    for rows, cols, seed in GENERATED_SIZES:
+        *parsed, firefighters = generate_map(rows, cols, seed)
+        yield f"generado_{rows}x{cols}", Scenario.from_parsed(*parsed, firefighters=firefighters)
+
+
+def is_border(pos, rows, cols):
+    row, col = pos
+    return row in (0, rows - 1) or col in (0, cols - 1)
+
+
+def check_exits(scenario):
+    """Toda salida de BoardModel y de BoardBatch debe estar en el borde del tablero."""
+    problems = []
+    rows, cols = scenario.width, scenario.height
+    model = BoardModel.from_scenario(scenario, collection_level="none", seed=0)
+    exits = [pos for pos, cost in model.planner.exit_distances().items() if cost == 0]
+    problems += [f"Salida fuera del borde en {pos}" for pos in exits if not is_border(pos, rows, cols)]
+
+    batch = BoardBatch(scenario, 1, np.random.default_rng(0))
+    cells = np.flatnonzero(batch.exit_mask(np.array([0]))[0])
+    vectorized = [(int(cell) // cols, int(cell) % cols) for cell in cells]
+    problems += [f"Salida vectorizada fuera del borde en {pos}" for pos in vectorized if not is_border(pos, rows, cols)]
+    if sorted(vectorized) != sorted(exits):
+        problems.append(f"Las salidas de BoardBatch {sorted(vectorized)} no son las de BoardModel {sorted(exits)}")
+    return problems
+
+
+def check_neighbors(scenario):
+    """Cada celda debe tener como vecinos sus cuatro lados dentro del tablero, en los dos motores."""
+    problems = []
+    rows, cols = scenario.width, scenario.height
+    model = BoardModel.from_scenario(scenario, collection_level="none", seed=0)
+    batch = BoardBatch(scenario, 1, np.random.default_rng(0))
+    for row in range(rows):
+        for col in range(cols):
+            expected = {
+                (row + d_row, col + d_col)
+                for d_row, d_col in ((-1, 0), (1, 0), (0, -1), (0, 1))
+                if 0 <= row + d_row < rows and 0 <= col + d_col < cols
+            }
+            found = set(model.get_adjacent_positions((row, col)))
+            if found != expected:
+                problems.append(f"BoardModel da a {(row, col)} los vecinos {sorted(found)}, no {sorted(expected)}")
+            cell = row * cols + col
+            vectorized = {divmod(int(adj), cols) for adj in batch.neighbors[cell][batch.adjacent[cell]]}
+            if vectorized != expected:
+                problems.append(f"BoardBatch da a {(row, col)} los vecinos {sorted(vectorized)}, no {sorted(expected)}")
+    return problems
+
+
+def check_fires(scenario):
+    """Todos los fuegos del mapa deben quedar en el tablero al empezar, en los dos motores."""
+    problems = []
+    cols = scenario.height
+    expected = {(fire['row'], fire['col']) for fire in scenario.fire_markers}
+    model = BoardModel.from_scenario(scenario, collection_level="none", seed=0)
+    if set(model.hazards.fires) != expected:
+        problems.append(f"BoardModel empieza con {len(model.hazards.fires)} de {len(expected)} fuegos")
+
+    batch = BoardBatch(scenario, 1, np.random.default_rng(0))
+    vectorized = {(int(cell) // cols, int(cell) % cols) for cell in np.flatnonzero(batch.fire[0])}
+    if vectorized != expected:
+        problems.append(f"BoardBatch empieza con {len(vectorized)} de {len(expected)} fuegos")
+    return problems
+
+
+def check_step_limit(scenario, num_games=20, max_steps=100):
+    """Con un límite de pasos por rondas ninguna partida debe pasar de `max_steps`."""
+    problems = []
+    for seed in range(num_games):
+        model = BoardModel.from_scenario(scenario, collection_level="none", seed=seed)
+        while model.steps < max_steps and not model.check_termination_conditions():
+            model.step_round(max_steps=max_steps)
+        if model.steps > max_steps:
+            problems.append(f"La partida con semilla {seed} terminó en {model.steps} pasos (límite {max_steps})")
+        elif model.steps < max_steps and not model.check_termination_conditions():
+            problems.append(f"La partida con semilla {seed} se detuvo en {model.steps} pasos sin terminar")
+    return problems
+
+
+def fixed_point_flashover(model):
+    """Flashover con el bucle de punto fijo original, sobre una copia del fuego y el humo.
+
+    Repite pasadas sobre todos los fuegos hasta que ningún humo se convierte,
+    sin usar la frontera de HazardLayer, así que un error en la frontera no se
+    repite en la referencia. Es contra lo que se compara el recorrido en
+    anchura de `process_fire_adjacent_smoke`. Regresa (fuegos, humos) como
+    conjuntos.
+    """
+    fires = set(model.hazards.fires)
+    smokes = set(model.hazards.smokes)
+
+    conversion_occurred = True
+    while conversion_occurred:
+        conversion_occurred = False
+        for fire_pos in list(fires):
+            for adj in model.get_adjacent_positions(fire_pos):
+                if adj in smokes and can_move(fire_pos, adj, model.wall_bits):
+                    smokes.remove(adj)
+                    fires.add(adj)
+                    conversion_occurred = True
+    return fires, smokes
+
+
+def compare_flashover(model, label):
+    """Corre el flashover de BoardModel y lo compara con la referencia; regresa los problemas."""
+    expected = fixed_point_flashover(model)
+    model.process_fire_adjacent_smoke()
+    found = (set(model.hazards.fires), set(model.hazards.smokes))
+    if found == expected:
+        return []
+    return [f"{label}: el flashover deja {len(found[0])} fuegos y {len(found[1])} humos, "
+            f"la referencia {len(expected[0])} y {len(expected[1])}"]
+
+
+def check_flashover(scenario, num_layouts=300, num_games=10, max_steps=300):
+    """Flashover igual a la referencia en tableros al azar y en partidas con semilla."""
+    problems = []
+    cells = [(row, col) for row in range(scenario.width) for col in range(scenario.height)]
+    for seed in range(num_layouts):
+        rng = random.Random(seed)
+        model = BoardModel.from_scenario(scenario, collection_level="none", seed=seed)
+        for pos in list(model.hazards.fires):
+            model.hazards.remove_fire(pos)
+        fire_share, smoke_share = rng.random() * 0.3, rng.random() * 0.8
+        for pos in cells:
+            draw = rng.random()
+            if draw < fire_share:
+                model.hazards.add_fire(pos)
+            elif draw < fire_share + smoke_share:
+                model.hazards.add_smoke(pos)
+        for door in model.doors:
+            if rng.random() < 0.5:
+                model.open_door(door)
+        problems += compare_flashover(model, f"tablero {seed}")
+
+    # En partidas, cada flashover se compara contra la referencia antes de correrlo
+    for seed in range(num_games):
+        model = BoardModel.from_scenario(scenario, collection_level="none", seed=seed)
+        flashover = model.process_fire_adjacent_smoke
+
+        def checked(model=model, flashover=flashover, seed=seed):
+            expected = fixed_point_flashover(model)
+            converted = flashover()
+            if (set(model.hazards.fires), set(model.hazards.smokes)) != expected:
+                problems.append(f"partida {seed}: el flashover del paso {model.steps} no coincide con la referencia")
+            return converted
+
+        model.process_fire_adjacent_smoke = checked
+        while model.steps < max_steps and not model.check_termination_conditions():
+            model.step_round(max_steps=max_steps)
+    return problems
+
+
+def check_equivalence(scenario, num_games=300, max_steps=600, alpha=0.01):
+    """BoardModel y BoardBatch deben dar las mismas distribuciones de resultados (como `--check`)."""
+    rows = []
+    for seed in range(num_games):
+        model = BoardModel.from_scenario(scenario, collection_level="none", seed=seed)
+        while model.steps < max_steps and not model.check_termination_conditions():
+            model.step_round(max_steps=max_steps)
+        summary = model.get_summary()
+        rows.append({column: summary[column] for column in ("victory", "rescued_victims", "total_damage", "steps")})
+    reference = pd.DataFrame(rows)
+    candidate = BoardBatch(scenario, num_games, np.random.default_rng(0), max_steps).run()
+
+    table, passed = compare_outcomes(reference, candidate, alpha)
+    if passed:
+        return []
+    return [f"{row.metrica}: referencia {row.referencia:.3f}, vectorizado {row.vectorizado:.3f} (p = {row.p:.4f})"
+            for row in table.itertuples() if row.p <= alpha]
+
+
+CHECKS = {
+    "salidas": check_exits,
+    "vecinos": check_neighbors,
+    "fuegos": check_fires,
+    "limite": check_step_limit,
+    "flashover": check_flashover,
+    "equivalencia": check_equivalence,
+}
+
+
+def run_checks(map_path=MAP_FILE, names=None):
+    """Corre las revisiones pedidas sobre todos los escenarios; regresa {revisión: problemas}."""
+    results = {}
+    loaded = list(scenarios(map_path))
+    for name in names or CHECKS:
+        results[name] = [f"{label}: {problem}" for label, scenario in loaded for problem in CHECKS[name](scenario)]
+    return results
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Revisiones de regresión del motor de Flash Point.")
+    parser.add_argument("--map", default=MAP_FILE)
+    parser.add_argument("--only", choices=list(CHECKS), action='append', help="revisiones a correr (todas por defecto)")
+    args = parser.parse_args()
+
+    failed = False
+    for name, problems in run_checks(args.map, args.only).items():
+        print(f"{name}: {'ok' if not problems else f'{len(problems)} problemas'}")
+        for problem in problems:
+            print(f"  {problem}")
+        failed = failed or bool(problems)
+    raise SystemExit(1 if failed else 0)